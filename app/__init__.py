@@ -3,6 +3,7 @@ Sistema de Cierre de Caja - KOAJ Puerto Carreño
 Flask Application Factory
 """
 from flask import Flask, request, send_from_directory, send_file
+from flask_compress import Compress
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -28,12 +29,34 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # JSON con orjson para jsonify / request.get_json
+    from app.utils.json_response import OrjsonProvider
+    app.json = OrjsonProvider(app)
+
+    # Validar la configuración crítica una sola vez al arrancar
+    app.config['CONFIG_ERRORS'] = config_class.validate()
+
     # Initialize SQLAlchemy database
     from app.models.user import db
     from app.models.koaj_code import KoajCode  # Import to ensure table is created
 
     db.init_app(app)
 
+    # Cliente de la API directa de Alegra: uno por app (un pool HTTP por worker)
+    from app.services.alegra_direct_client import AlegraDirectClient
+    app.extensions['alegra_direct'] = AlegraDirectClient(
+        app.config['ALEGRA_USER'],
+        app.config['ALEGRA_PASS'],
+        app.config['ALEGRA_API_BASE_URL'],
+        app.config['ALEGRA_TIMEOUT'],
+        pool_maxsize=app.config['ALEGRA_POOL_MAXSIZE'],
+        cache_ttl=app.config['ALEGRA_CACHE_TTL']
+    )
+
+    # Configurar hasher de contraseñas (Argon2id)
+    from app.services.password_service import PasswordService
+    PasswordService.init_app(app)
+
     # Create tables if they don't exist
     with app.app_context():
         try:
@@ -88,6 +111,9 @@ def create_app(config_class=Config):
 
         return response
 
+    # Comprimir respuestas grandes (gzip/br) según Accept-Encoding del cliente
+    Compress(app)
+
     # Configurar Flask-Talisman para headers de seguridad
     # Solo habilitar en producción (cuando no está en modo DEBUG)
     if not app.config['DEBUG']:
@@ -24,6 +24,13 @@ class Config:
         'https://api.alegra.com/api/v1'
     )
     ALEGRA_TIMEOUT = int(os.getenv('ALEGRA_TIMEOUT', '180'))  # 3 minutos para consultas de inventario completo
+    # Conexiones HTTP reutilizables hacia Alegra por proceso. Debe cubrir los hilos del
+    # worker (gunicorn --threads) más los pools de páginas y del dashboard
+    ALEGRA_POOL_MAXSIZE = int(os.getenv('ALEGRA_POOL_MAXSIZE', '50'))
+    # Segundos que se reutilizan los reportes de inventario y totales de ventas (0 desactiva).
+    # Es la antigüedad máxima de esas respuestas: las rutas con cache propio (dashboard,
+    # quick-summary) llaman con use_cache=False para no sumar ambos TTL
+    ALEGRA_CACHE_TTL = int(os.getenv('ALEGRA_CACHE_TTL', '60'))
 
     # Configuración de negocio - Cierre de caja
     BASE_OBJETIVO = int(os.getenv('BASE_OBJETIVO', '450000'))
@@ -59,6 +66,12 @@ class Config:
     # Ejemplo: /home/jdbarajass/cierre-caja-frontend/dist
     FRONTEND_DIST_PATH = os.getenv('FRONTEND_DIST_PATH', None)
 
+    # Compresión de respuestas (Flask-Compress, según Accept-Encoding)
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = 4  # gzip
+    COMPRESS_BR_LEVEL = 4  # brotli
+
     # Rate Limiting
     RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'memory://')
     RATELIMIT_DEFAULT = os.getenv('RATELIMIT_DEFAULT', '200 per day;50 per hour')
@@ -88,6 +101,11 @@ class Config:
     MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', '5'))
     LOCKOUT_TIME_MINUTES = int(os.getenv('LOCKOUT_TIME_MINUTES', '15'))
 
+    # Password hashing (Argon2id). Los hashes bcrypt existentes se migran en el login
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '65536'))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '1'))
+
     @classmethod
     def validate(cls):
         """Valida que la configuración crítica esté presente"""
@@ -131,6 +149,10 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
 
+    # Hash de contraseñas barato: solo para tests, nunca en producción
+    ARGON2_TIME_COST = 1
+    ARGON2_MEMORY_COST = 1024  # KiB
+
 
 # Mapeo de configuraciones
 config_by_name = {
@@ -34,6 +34,15 @@ class AlegraConnectionError(CierreCajaException):
         super().__init__(message, status_code=502, payload=payload)
 
 
+class AlegraCircuitOpenError(AlegraConnectionError):
+    """Alegra falló repetidamente y las peticiones se cortan sin intentar (circuit breaker)"""
+
+    def __init__(self, message="Alegra no disponible temporalmente, intente más tarde"):
+        super().__init__(message)
+        self.status_code = 503
+        self.payload['type'] = 'circuit_open'
+
+
 class AlegraAuthError(CierreCajaException):
     """Error de autenticación con Alegra"""
 
@@ -16,6 +16,33 @@ def get_current_user():
     return getattr(g, 'current_user', None)
 
 
+def get_request_token():
+    """
+    Obtiene el token JWT de la petición actual
+
+    Returns:
+        Token de la cookie httpOnly o, en su defecto, del header Authorization
+        (None si no se envió ninguno)
+    """
+    # PRIORIDAD 1: Intentar obtener el token de la cookie httpOnly
+    token = request.cookies.get('access_token')
+
+    # PRIORIDAD 2 (fallback): Obtener el token del header Authorization
+    if not token:
+        auth_header = request.headers.get('Authorization')
+
+        if auth_header:
+            # Formato esperado: "Bearer <token>"
+            parts = auth_header.split()
+            if len(parts) == 2 and parts[0].lower() == 'bearer':
+                token = parts[1]
+            elif len(parts) == 1:
+                # Por si envían solo el token sin "Bearer"
+                token = parts[0]
+
+    return token
+
+
 def token_required(f):
     """
     Decorador que requiere un token JWT válido para acceder al endpoint
@@ -33,23 +60,7 @@ def token_required(f):
         if request.method == 'OPTIONS':
             return '', 204  # Respuesta vacía exitosa para preflight
 
-        token = None
-
-        # PRIORIDAD 1: Intentar obtener el token de la cookie httpOnly
-        token = request.cookies.get('access_token')
-
-        # PRIORIDAD 2 (fallback): Obtener el token del header Authorization
-        if not token:
-            auth_header = request.headers.get('Authorization')
-
-            if auth_header:
-                # Formato esperado: "Bearer <token>"
-                parts = auth_header.split()
-                if len(parts) == 2 and parts[0].lower() == 'bearer':
-                    token = parts[1]
-                elif len(parts) == 1:
-                    # Por si envían solo el token sin "Bearer"
-                    token = parts[0]
+        token = get_request_token()
 
         if not token:
             logger.warning(f"Token no proporcionado - IP: {request.remote_addr}")
@@ -2,8 +2,28 @@
 Modelo de Código KOAJ para catálogo de códigos de barras
 """
 from datetime import datetime
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+
 from app.models.user import db
 
+# Tiempo máximo (segundos) que se reutiliza el catálogo cacheado antes de recargarlo.
+# Las escrituras ORM en este proceso invalidan el cache al hacer commit; el TTL cubre
+# cambios hechos desde otros workers o scripts.
+CACHE_TTL_SECONDS = 300
+
+# Marca en session.info de que la transacción modificó códigos KOAJ
+_DIRTY_FLAG = 'koaj_codes_dirty'
+
+
+def _numeric_code_key(code):
+    """Clave de orden por valor numérico del código (no numéricos al final)"""
+    return (0, int(code), code) if code.isdigit() else (1, 0, code)
+
 
 class KoajCode(db.Model):
     """Modelo para almacenar los códigos de categorías KOAJ"""
@@ -18,6 +38,12 @@ class KoajCode(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Cache en memoria de los códigos activos {code: dict} (por proceso),
+    # en orden numérico de código
+    _cache = None
+    _cache_loaded_at = 0.0
+    _cache_lock = threading.RLock()
+
     def __repr__(self):
         return f'<KoajCode {self.code}: {self.category}>'
 
@@ -33,3 +59,94 @@ class KoajCode(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+    @classmethod
+    def insert_if_absent(cls, **values):
+        """
+        Inserta un código en un solo INSERT ... ON CONFLICT (code) DO NOTHING RETURNING,
+        sin SELECT previo y sin carrera entre admins concurrentes.
+
+        Returns:
+            KoajCode insertado o None si el código ya existía
+
+        Nota: no invalida el cache; llamar a invalidate_cache() tras el commit
+        """
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(cls)
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(cls)
+        else:
+            # Otros motores: verificación previa + INSERT ORM
+            if db.session.query(cls.id).filter_by(code=values['code']).first():
+                return None
+            koaj_code = cls(**values)
+            db.session.add(koaj_code)
+            db.session.flush()
+            return koaj_code
+
+        # Los INSERT por sentencia no disparan los eventos del mapper: quien
+        # llama debe invalidar el cache después del commit
+        return db.session.execute(
+            stmt.values(**values)
+            .on_conflict_do_nothing(index_elements=['code'])
+            .returning(cls)
+        ).scalar_one_or_none()
+
+    @classmethod
+    def load_cache(cls):
+        """Carga todos los códigos activos en el cache en memoria (ordenados por código)"""
+        codes = sorted(cls.query.filter_by(is_active=True).all(), key=lambda c: _numeric_code_key(c.code))
+        cache = {c.code: c.to_dict() for c in codes}
+        with cls._cache_lock:
+            cls._cache = cache
+            cls._cache_loaded_at = time.monotonic()
+        return cache
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Descarta el cache (se recarga en la siguiente consulta)"""
+        with cls._cache_lock:
+            cls._cache = None
+
+    @classmethod
+    def _get_cache(cls):
+        """Retorna el cache vigente, recargándolo si no existe o expiró"""
+        with cls._cache_lock:
+            cache = cls._cache
+            if cache is not None and time.monotonic() - cls._cache_loaded_at < CACHE_TTL_SECONDS:
+                return cache
+        return cls.load_cache()
+
+    @classmethod
+    def get_active_codes(cls):
+        """Retorna la lista de códigos activos (como dicts) desde el cache, en orden numérico"""
+        return list(cls._get_cache().values())
+
+
+@event.listens_for(KoajCode, 'after_insert')
+@event.listens_for(KoajCode, 'after_update')
+@event.listens_for(KoajCode, 'after_delete')
+def _mark_koaj_codes_dirty(mapper, connection, target):
+    """
+    Marca la sesión ante cualquier escritura ORM de códigos
+
+    Estos eventos ocurren en el flush, antes del commit: invalidar aquí dejaría
+    que otra petición recargue el catálogo sin el cambio y lo fije por todo el TTL
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_koaj_code_cache(session):
+    """Invalida el cache de códigos cuando la transacción que los modificó se confirma"""
+    if session.info.pop(_DIRTY_FLAG, False):
+        KoajCode.invalidate_cache()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_koaj_codes_dirty(session):
+    """Descarta la marca si la transacción se revierte (el cache sigue siendo válido)"""
+    session.info.pop(_DIRTY_FLAG, None)
@@ -1,10 +1,57 @@
 """
 Modelos Pydantic para requests
 """
-from pydantic import BaseModel, Field, field_validator, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict, EmailStr, conint
 from datetime import date as date_type
 from typing import Dict, List, Optional
-import re
+import string
+
+from app.config import Config
+from app.utils.timezone import get_colombia_now
+
+# Orden de las denominaciones para los formatos vectoriales coins_vec/bills_vec
+COIN_ORDER = tuple(Config.DENOMINACIONES_MONEDAS)
+BILL_ORDER = tuple(Config.DENOMINACIONES_BILLETES)
+
+# Patrones y conjuntos precompilados para los validadores
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+_ALLOWED_ROLES = ('admin', 'sales')
+
+
+def _check_password_strength(v: str) -> str:
+    """Valida que la contraseña tenga mayúscula, minúscula y número"""
+    if _UPPER.isdisjoint(v):
+        raise ValueError('La contraseña debe contener al menos una mayúscula')
+    if _LOWER.isdisjoint(v):
+        raise ValueError('La contraseña debe contener al menos una minúscula')
+    if _DIGITS.isdisjoint(v):
+        raise ValueError('La contraseña debe contener al menos un número')
+    return v
+
+
+def _normalize_counts(counts: Dict[str, int], valid_denominations) -> Dict[int, int]:
+    """
+    Mapea un conteo {"denominación": cantidad} a {denominación: cantidad}
+    en una sola pasada sobre las denominaciones válidas.
+
+    Las cantidades negativas ya se rechazan en validate_non_negative.
+    """
+    get = counts.get
+    return {d: int(get(str(d), 0)) for d in valid_denominations}
+
+
+def _vec_to_counts(vec: List[int], order: tuple, valid_denominations) -> Dict[int, int]:
+    """
+    Mapea un vector de cantidades (en el orden `order`) a {denominación: cantidad}
+
+    Raises:
+        ValueError: Si las denominaciones válidas no coinciden con el orden del vector
+    """
+    if tuple(valid_denominations) != order:
+        raise ValueError(f"El formato vectorial requiere las denominaciones {list(order)}")
+    return dict(zip(order, vec))
 
 
 class CashClosingRequest(BaseModel):
@@ -27,6 +74,20 @@ class CashClosingRequest(BaseModel):
         description="Diccionario de billetes por denominación {denominación: cantidad}"
     )
 
+    coins_vec: Optional[List[conint(ge=0)]] = Field(
+        default=None,
+        min_length=len(COIN_ORDER),
+        max_length=len(COIN_ORDER),
+        description=f"Cantidades de monedas en orden {list(COIN_ORDER)} (alternativa compacta a coins)"
+    )
+
+    bills_vec: Optional[List[conint(ge=0)]] = Field(
+        default=None,
+        min_length=len(BILL_ORDER),
+        max_length=len(BILL_ORDER),
+        description=f"Cantidades de billetes en orden {list(BILL_ORDER)} (alternativa compacta a bills)"
+    )
+
     excedente: float = Field(
         default=0,
         ge=0,
@@ -96,16 +157,25 @@ class CashClosingRequest(BaseModel):
     @classmethod
     def validate_non_negative(cls, v):
         """Valida que todas las cantidades sean no negativas"""
-        for denom, qty in v.items():
-            if qty < 0:
-                raise ValueError(f"La cantidad para denominación {denom} no puede ser negativa: {qty}")
+        if v and min(v.values()) < 0:
+            denom = next(d for d, qty in v.items() if qty < 0)
+            raise ValueError(f"La cantidad para denominación {denom} no puede ser negativa: {v[denom]}")
         return v
 
+    @model_validator(mode='after')
+    def validate_single_count_format(self):
+        """Valida que cada conteo llegue en un solo formato (dict o vector)"""
+        sent = self.model_fields_set
+        if 'coins' in sent and 'coins_vec' in sent:
+            raise ValueError('Envíe las monedas en coins o en coins_vec, no en ambos')
+        if 'bills' in sent and 'bills_vec' in sent:
+            raise ValueError('Envíe los billetes en bills o en bills_vec, no en ambos')
+        return self
+
     @field_validator('date')
     @classmethod
     def validate_date_not_future(cls, v):
         """Valida que la fecha no sea futura (usando zona horaria de Colombia)"""
-        from app.utils.timezone import get_colombia_now
         today_colombia = get_colombia_now().date()
         if v > today_colombia:
             raise ValueError(f"La fecha no puede ser futura: {v} (hoy en Colombia: {today_colombia})")
@@ -120,13 +190,13 @@ class CashClosingRequest(BaseModel):
 
         Returns:
             Dict con claves int y valores int
+
+        Raises:
+            ValueError: Si se usó el formato vectorial con otras denominaciones
         """
-        result = {d: 0 for d in valid_denominations}
-        for key, value in self.coins.items():
-            denom = int(key)
-            if denom in valid_denominations:
-                result[denom] = max(0, int(value))
-        return result
+        if self.coins_vec is not None:
+            return _vec_to_counts(self.coins_vec, COIN_ORDER, valid_denominations)
+        return _normalize_counts(self.coins, valid_denominations)
 
     def get_normalized_bills(self, valid_denominations: list) -> Dict[int, int]:
         """
@@ -137,13 +207,13 @@ class CashClosingRequest(BaseModel):
 
         Returns:
             Dict con claves int y valores int
+
+        Raises:
+            ValueError: Si se usó el formato vectorial con otras denominaciones
         """
-        result = {d: 0 for d in valid_denominations}
-        for key, value in self.bills.items():
-            denom = int(key)
-            if denom in valid_denominations:
-                result[denom] = max(0, int(value))
-        return result
+        if self.bills_vec is not None:
+            return _vec_to_counts(self.bills_vec, BILL_ORDER, valid_denominations)
+        return _normalize_counts(self.bills, valid_denominations)
 
 
 class UserCreateRequest(BaseModel):
@@ -151,10 +221,8 @@ class UserCreateRequest(BaseModel):
 
     model_config = ConfigDict(str_strip_whitespace=True)
 
-    email: str = Field(
+    email: EmailStr = Field(
         ...,
-        min_length=5,
-        max_length=255,
         description="Email del usuario"
     )
 
@@ -179,32 +247,22 @@ class UserCreateRequest(BaseModel):
 
     @field_validator('email')
     @classmethod
-    def validate_email(cls, v):
-        """Valida el formato del email"""
-        pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        if not re.match(pattern, v):
-            raise ValueError('Formato de email inválido')
+    def normalize_email(cls, v):
+        """Normaliza el email (el formato ya lo valida EmailStr)"""
         return v.lower()
 
     @field_validator('password')
     @classmethod
     def validate_password(cls, v):
         """Valida la fortaleza de la contraseña"""
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('La contraseña debe contener al menos una mayúscula')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('La contraseña debe contener al menos una minúscula')
-        if not re.search(r'\d', v):
-            raise ValueError('La contraseña debe contener al menos un número')
-        return v
+        return _check_password_strength(v)
 
     @field_validator('role')
     @classmethod
     def validate_role(cls, v):
         """Valida que el rol sea válido"""
-        allowed_roles = ['admin', 'sales']
-        if v.lower() not in allowed_roles:
-            raise ValueError(f'Rol inválido. Debe ser uno de: {", ".join(allowed_roles)}')
+        if v.lower() not in _ALLOWED_ROLES:
+            raise ValueError(f'Rol inválido. Debe ser uno de: {", ".join(_ALLOWED_ROLES)}')
         return v.lower()
 
 
@@ -213,10 +271,8 @@ class UserUpdateRequest(BaseModel):
 
     model_config = ConfigDict(str_strip_whitespace=True)
 
-    email: Optional[str] = Field(
+    email: Optional[EmailStr] = Field(
         default=None,
-        min_length=5,
-        max_length=255,
         description="Email del usuario"
     )
 
@@ -239,13 +295,10 @@ class UserUpdateRequest(BaseModel):
 
     @field_validator('email')
     @classmethod
-    def validate_email(cls, v):
-        """Valida el formato del email"""
+    def normalize_email(cls, v):
+        """Normaliza el email (el formato ya lo valida EmailStr)"""
         if v is None:
             return v
-        pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        if not re.match(pattern, v):
-            raise ValueError('Formato de email inválido')
         return v.lower()
 
     @field_validator('role')
@@ -254,9 +307,8 @@ class UserUpdateRequest(BaseModel):
         """Valida que el rol sea válido"""
         if v is None:
             return v
-        allowed_roles = ['admin', 'sales']
-        if v.lower() not in allowed_roles:
-            raise ValueError(f'Rol inválido. Debe ser uno de: {", ".join(allowed_roles)}')
+        if v.lower() not in _ALLOWED_ROLES:
+            raise ValueError(f'Rol inválido. Debe ser uno de: {", ".join(_ALLOWED_ROLES)}')
         return v.lower()
 
 
@@ -279,17 +331,18 @@ class DateRangeRequest(BaseModel):
     @classmethod
     def validate_date_range(cls, v):
         """Valida que las fechas estén en un rango razonable"""
-        from datetime import date
         if v.year < 2020:
             raise ValueError('La fecha debe ser posterior a 2020')
-        if v > date.today():
+        if v > date_type.today():
             raise ValueError('La fecha no puede ser futura')
         return v
 
-    def model_post_init(self, __context):
+    @model_validator(mode='after')
+    def validate_start_before_end(self):
         """Valida que start_date <= end_date"""
         if self.start_date > self.end_date:
             raise ValueError('La fecha de inicio no puede ser posterior a la fecha de fin')
+        return self
 
 
 class ChangePasswordRequest(BaseModel):
@@ -314,10 +367,4 @@ class ChangePasswordRequest(BaseModel):
     @classmethod
     def validate_new_password(cls, v):
         """Valida la fortaleza de la nueva contraseña"""
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('La contraseña debe contener al menos una mayúscula')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('La contraseña debe contener al menos una minúscula')
-        if not re.search(r'\d', v):
-            raise ValueError('La contraseña debe contener al menos un número')
-        return v
+        return _check_password_strength(v)
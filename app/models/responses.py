@@ -1,5 +1,10 @@
 """
 Modelos Pydantic para responses
+
+Estos modelos documentan la forma de las respuestas; los handlers arman
+los dicts directamente (datos generados por el servidor, sin validar).
+Si se necesita materializar un modelo a partir de datos propios, usar
+Model.model_construct(...) para evitar re-validarlos.
 """
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Dict, Any
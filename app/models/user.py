@@ -1,8 +1,9 @@
 """
 Modelo de Usuario para autenticación
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, func, update
 
 db = SQLAlchemy()
 
@@ -53,5 +54,34 @@ class User(db.Model):
 
     def lock_account(self, minutes=15):
         """Bloquea la cuenta por un tiempo determinado"""
-        from datetime import timedelta
         self.locked_until = datetime.utcnow() + timedelta(minutes=minutes)
+
+    @classmethod
+    def register_failed_attempt(cls, user_id, max_attempts, lockout_minutes):
+        """
+        Registra un intento fallido en un solo UPDATE atómico: incrementa el
+        contador y, si alcanza max_attempts, fija locked_until.
+
+        Args:
+            user_id: ID del usuario
+            max_attempts: Intentos permitidos antes de bloquear
+            lockout_minutes: Minutos de bloqueo
+
+        Returns:
+            tuple: (intentos_fallidos, bloqueada)
+        """
+        new_attempts = func.coalesce(cls.failed_login_attempts, 0) + 1
+        attempts = db.session.execute(
+            update(cls)
+            .where(cls.id == user_id)
+            .values(
+                failed_login_attempts=new_attempts,
+                locked_until=case(
+                    (new_attempts >= max_attempts,
+                     datetime.utcnow() + timedelta(minutes=lockout_minutes)),
+                    else_=cls.locked_until
+                )
+            )
+            .returning(cls.failed_login_attempts)
+        ).scalar_one()
+        return attempts, attempts >= max_attempts
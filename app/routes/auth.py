@@ -1,14 +1,18 @@
 """
 Rutas de autenticacion
-Autenticacion basada en base de datos con bcrypt
+Autenticacion basada en base de datos con Argon2id (bcrypt legado)
 """
-from flask import Blueprint, request, jsonify, current_app, make_response
-import bcrypt
-import re
+from flask import Blueprint, request, current_app
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from email_validator import validate_email as _validate_email_address, EmailNotValidError
+from sqlalchemy import select, update
 
 from app.services.jwt_service import JWTService
+from app.middlewares.auth import token_required, get_current_user, get_request_token
+from app.services.password_service import PasswordService
+from app.utils.json_response import ojsonify
 from app.models.user import db, User
 
 logger = logging.getLogger(__name__)
@@ -17,9 +21,12 @@ bp = Blueprint('auth', __name__)
 
 
 def validate_email(email: str) -> bool:
-    """Valida el formato del email"""
-    pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-    return bool(re.match(pattern, email))
+    """Valida el formato del email (sin consultar DNS)"""
+    try:
+        _validate_email_address(email, check_deliverability=False)
+        return True
+    except EmailNotValidError:
+        return False
 
 
 def validate_password(password: str) -> bool:
@@ -27,7 +34,14 @@ def validate_password(password: str) -> bool:
     return 8 <= len(password) <= 128
 
 
-@bp.route('/login', methods=['POST', 'OPTIONS'])
+@bp.route('/login', methods=['OPTIONS'])
+@bp.route('/logout', methods=['OPTIONS'])
+def auth_preflight():
+    """Responde el preflight CORS sin leer ni validar el cuerpo de la peticion"""
+    return '', 204
+
+
+@bp.route('/login', methods=['POST'])
 def login():
     """
     Endpoint de autenticacion con base de datos
@@ -80,102 +94,111 @@ def login():
       500:
         description: Error interno del servidor
     """
-    # Manejar preflight CORS
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
         data = request.get_json()
 
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No se recibieron datos'
-            }), 400
+            }, 400)
 
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
 
         # Validaciones basicas
         if not email or not password:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Email y contrasena son requeridos'
-            }), 400
+            }, 400)
 
         if not validate_email(email):
-            logger.warning(f"Intento de login con email invalido: {email} - IP: {request.remote_addr}")
-            return jsonify({
+            logger.warning("Intento de login con email invalido: %s - IP: %s", email, request.remote_addr)
+            return ojsonify({
                 'success': False,
                 'message': 'Formato de email invalido'
-            }), 400
+            }, 400)
 
         if not validate_password(password):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'La contrasena debe tener entre 8 y 128 caracteres'
-            }), 400
+            }, 400)
 
-        # Buscar usuario en la base de datos
-        user = User.query.filter_by(email=email).first()
+        # Buscar usuario en la base de datos (solo las columnas necesarias)
+        user = db.session.execute(
+            select(
+                User.id, User.email, User.name, User.role, User.password_hash,
+                User.is_active, User.failed_login_attempts, User.locked_until
+            ).where(User.email == email)
+        ).first()
 
         if not user:
-            logger.warning(f"Usuario no existe: {email} - IP: {request.remote_addr}")
-            return jsonify({
+            logger.warning("Usuario no existe: %s - IP: %s", email, request.remote_addr)
+            return ojsonify({
                 'success': False,
                 'message': 'Credenciales incorrectas'
-            }), 401
+            }, 401)
 
         # Verificar cuenta activa
         if not user.is_active:
-            logger.warning(f"Cuenta inactiva: {email} - IP: {request.remote_addr}")
-            return jsonify({
+            logger.warning("Cuenta inactiva: %s - IP: %s", email, request.remote_addr)
+            return ojsonify({
                 'success': False,
                 'message': 'Cuenta inactiva. Contacte al administrador.'
-            }), 403
+            }, 403)
 
         # Verificar si la cuenta esta bloqueada
-        if user.is_locked():
-            logger.warning(f"Intento de login en cuenta bloqueada: {email} - IP: {request.remote_addr}")
-            return jsonify({
+        if user.locked_until is not None and datetime.utcnow() < user.locked_until:
+            logger.warning("Intento de login en cuenta bloqueada: %s - IP: %s", email, request.remote_addr)
+            return ojsonify({
                 'success': False,
                 'message': 'Cuenta bloqueada temporalmente. Intente mas tarde.'
-            }), 403
+            }, 403)
 
-        # Verificar contrasena con bcrypt
+        # Verificar contrasena (Argon2id o bcrypt legado)
         max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
         lockout_time = current_app.config.get('LOCKOUT_TIME_MINUTES', 15)
 
-        if not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
-            # Incrementar intentos fallidos
-            user.increment_failed_attempts()
+        if not PasswordService.verify_password(password, user.password_hash):
+            # Incrementar intentos fallidos (y bloquear si corresponde) en un solo UPDATE
+            failed_attempts, locked = User.register_failed_attempt(user.id, max_attempts, lockout_time)
+            db.session.commit()
 
-            if user.failed_login_attempts >= max_attempts:
-                user.lock_account(minutes=lockout_time)
-                db.session.commit()
+            if locked:
                 logger.warning(
-                    f"Cuenta bloqueada por multiples intentos fallidos: {email} "
-                    f"- IP: {request.remote_addr}"
+                    "Cuenta bloqueada por multiples intentos fallidos: %s - IP: %s",
+                    email, request.remote_addr
                 )
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': f'Cuenta bloqueada por {lockout_time} minutos debido a multiples intentos fallidos'
-                }), 403
+                }, 403)
 
-            db.session.commit()
             logger.warning(
-                f"Login fallido - Contrasena incorrecta: {email} "
-                f"- Intentos: {user.failed_login_attempts}/{max_attempts} - IP: {request.remote_addr}"
+                "Login fallido - Contrasena incorrecta: %s - Intentos: %s/%s - IP: %s",
+                email, failed_attempts, max_attempts, request.remote_addr
             )
 
-            return jsonify({
+            return ojsonify({
                 'success': False,
-                'message': f'Credenciales incorrectas ({user.failed_login_attempts}/{max_attempts} intentos)'
-            }), 401
+                'message': f'Credenciales incorrectas ({failed_attempts}/{max_attempts} intentos)'
+            }, 401)
 
-        # Login exitoso - Resetear intentos fallidos
-        user.reset_failed_attempts()
-        db.session.commit()
+        # Login exitoso - Resetear intentos fallidos (solo si hay algo que resetear)
+        changes = {}
+        if user.failed_login_attempts or user.locked_until is not None:
+            changes.update(failed_login_attempts=0, locked_until=None)
+
+        # Migrar hashes bcrypt legados (o parametros Argon2 antiguos) a Argon2id
+        if PasswordService.needs_rehash(user.password_hash):
+            changes['password_hash'] = PasswordService.hash_password(password)
+            logger.info("Hash de contrasena migrado a Argon2id: %s", user.email)
+
+        if changes:
+            db.session.execute(update(User).where(User.id == user.id).values(**changes))
+            db.session.commit()
 
         # Generar token JWT
         token = JWTService.generate_token(
@@ -185,12 +208,12 @@ def login():
         )
 
         logger.info(
-            f"Login exitoso: {user.email} (rol: {user.role}) - IP: {request.remote_addr} "
-            f"- Timestamp: {datetime.utcnow().isoformat()}"
+            "Login exitoso: %s (rol: %s) - IP: %s - Timestamp: %s",
+            user.email, user.role, request.remote_addr, datetime.utcnow().isoformat()
         )
 
         # Crear respuesta con cookie httpOnly
-        response = make_response(jsonify({
+        response = ojsonify({
             'success': True,
             'token': token,  # También enviamos en body para compatibilidad
             'user': {
@@ -199,7 +222,7 @@ def login():
                 'name': user.name,
                 'role': user.role
             }
-        }), 200)
+        })
 
         # Configurar cookie httpOnly para el token JWT
         # La cookie expira en 8 horas (igual que el token)
@@ -234,14 +257,14 @@ def login():
         return response
 
     except Exception as e:
-        logger.error(f"Error en login: {str(e)} - IP: {request.remote_addr}")
-        return jsonify({
+        logger.error("Error en login: %s - IP: %s", e, request.remote_addr)
+        return ojsonify({
             'success': False,
             'message': 'Error interno del servidor'
-        }), 500
+        }, 500)
 
 
-@bp.route('/logout', methods=['POST', 'OPTIONS'])
+@bp.route('/logout', methods=['POST'])
 def logout():
     """
     Endpoint para cerrar sesion y eliminar cookie
@@ -252,14 +275,15 @@ def logout():
       200:
         description: Logout exitoso
     """
-    # Manejar preflight CORS
-    if request.method == 'OPTIONS':
-        return '', 204
+    # Descartar el payload cacheado del token que se esta cerrando (cookie o header)
+    token = get_request_token()
+    if token:
+        JWTService.invalidate_token(token)
 
-    response = make_response(jsonify({
+    response = ojsonify({
         'success': True,
         'message': 'Sesion cerrada exitosamente'
-    }), 200)
+    })
 
     # Eliminar la cookie de acceso
     is_production = not current_app.config.get('DEBUG', False)
@@ -274,11 +298,12 @@ def logout():
         expires=0
     )
 
-    logger.info(f"Logout exitoso - IP: {request.remote_addr}")
+    logger.info("Logout exitoso - IP: %s", request.remote_addr)
     return response
 
 
 @bp.route('/verify', methods=['GET', 'OPTIONS'])
+@token_required
 def verify_token():
     """
     Verifica si el token es valido
@@ -297,15 +322,9 @@ def verify_token():
       401:
         description: Token invalido o expirado
     """
-    from app.middlewares.auth import token_required, get_current_user
-
-    @token_required
-    def _verify():
-        user = get_current_user()
-        return jsonify({
-            'success': True,
-            'message': 'Token valido',
-            'user': user
-        }), 200
-
-    return _verify()
+    user = get_current_user()
+    return ojsonify({
+        'success': True,
+        'message': 'Token valido',
+        'user': user
+    }, 200)
@@ -1,12 +1,14 @@
 """
 Endpoint de cierre de caja
 """
+import logging
+
 from flask import Blueprint, request, jsonify, current_app
 from pydantic import ValidationError as PydanticValidationError
 from flasgger import swag_from
 
 from app.config import Config
-from app.models.requests import CashClosingRequest
+from app.models.requests import CashClosingRequest, COIN_ORDER, BILL_ORDER
 from app.services.cash_calculator import (
     CashCalculator,
     procesar_excedentes,
@@ -31,10 +33,47 @@ from app.utils.timezone import (
     get_colombia_timestamp
 )
 from app.middlewares.auth import token_required, get_current_user, role_required_any
+from app.utils.json_response import ojsonify
 
 bp = Blueprint('cash_closing', __name__)
 
 
+def _format_pydantic_errors(e: PydanticValidationError) -> str:
+    """Convierte los errores de Pydantic en 'campo: mensaje; campo: mensaje'"""
+    return '; '.join(
+        f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+    )
+
+
+def _build_partial_response(cash_result, alegra_error, datetime_info, tz_used, date):
+    """
+    Construye la respuesta parcial del cierre cuando no se pudo consultar Alegra
+
+    Args:
+        cash_result: Resultado del conteo de caja
+        alegra_error: Dict con el error de Alegra
+        datetime_info: Información de fecha/hora de la petición
+        tz_used: Zona horaria usada
+        date: Fecha del cierre solicitada
+
+    Returns:
+        Dict de respuesta con success=False
+    """
+    return {
+        "success": False,
+        "request_datetime": datetime_info['iso'],
+        "request_date": datetime_info['date'],
+        "request_time": datetime_info['time'],
+        "request_tz": tz_used,
+        "server_timestamp": get_colombia_timestamp(),
+        "timezone": "America/Bogota",
+        "date_requested": str(date),
+        "username_used": Config.ALEGRA_USER,
+        "cash_count": cash_result,
+        "alegra": alegra_error
+    }
+
+
 @bp.route('/sum_payments', methods=['POST', 'OPTIONS'])
 @token_required
 @role_required_any(['admin', 'sales'])
@@ -77,6 +116,20 @@ def sum_payments():
                 "20000": 12
                 "50000": 12
                 "100000": 9
+            coins_vec:
+              type: array
+              items:
+                type: integer
+                minimum: 0
+              description: Alternativa a coins (no enviar ambos) - cantidades en orden [50, 100, 200, 500, 1000]
+              example: [0, 6, 40, 1, 0]
+            bills_vec:
+              type: array
+              items:
+                type: integer
+                minimum: 0
+              description: Alternativa a bills (no enviar ambos) - cantidades en orden [2000, 5000, 10000, 20000, 50000, 100000]
+              example: [16, 7, 7, 12, 12, 9]
             excedente:
               type: number
               minimum: 0
@@ -111,10 +164,10 @@ def sum_payments():
     datetime_info = format_datetime_info(now)
 
     current_app.logger.info("=" * 80)
-    current_app.logger.info(f"Nueva petición de cierre de caja: {datetime_info['iso']}")
+    current_app.logger.info("Nueva petición de cierre de caja: %s", datetime_info['iso'])
 
-    # Validar configuración
-    config_errors = Config.validate()
+    # Validar configuración (calculada una sola vez en create_app)
+    config_errors = current_app.config['CONFIG_ERRORS']
     if config_errors:
         current_app.logger.error(f"Errores de configuración: {config_errors}")
         raise ConfigurationError(
@@ -133,17 +186,14 @@ def sum_payments():
 
     # Validar con Pydantic
     try:
-        cash_request = CashClosingRequest(**data)
+        # model_validate reutiliza el core schema ya compilado del modelo
+        # y evita desempaquetar el body como kwargs
+        cash_request = CashClosingRequest.model_validate(data)
     except PydanticValidationError as e:
         current_app.logger.error(f"Error de validación Pydantic: {e}")
-        errors = []
-        for error in e.errors():
-            field = '.'.join(str(x) for x in error['loc'])
-            msg = error['msg']
-            errors.append(f"{field}: {msg}")
-        raise ValidationError(f"Errores de validación: {'; '.join(errors)}")
+        raise ValidationError(f"Errores de validación: {_format_pydantic_errors(e)}")
 
-    current_app.logger.info(f"Fecha solicitada: {cash_request.date}")
+    current_app.logger.info("Fecha solicitada: %s", cash_request.date)
 
     # ========================================
     # VALIDAR ZONA HORARIA
@@ -186,12 +236,12 @@ def sum_payments():
     # Calcular días de diferencia para logging
     dias_diferencia = (colombia_now.date() - cierre_date.date()).days
 
-    current_app.logger.info(f"✓ Fecha validada: {date_string} (Colombia timezone)")
-    current_app.logger.info(f"✓ Días desde el cierre: {dias_diferencia}")
+    current_app.logger.info("✓ Fecha validada: %s (Colombia timezone)", date_string)
+    current_app.logger.info("✓ Días desde el cierre: %s", dias_diferencia)
 
     # Normalizar conteos
-    conteo_monedas = cash_request.get_normalized_coins(Config.DENOMINACIONES_MONEDAS)
-    conteo_billetes = cash_request.get_normalized_bills(Config.DENOMINACIONES_BILLETES)
+    conteo_monedas = cash_request.get_normalized_coins(COIN_ORDER)
+    conteo_billetes = cash_request.get_normalized_bills(BILL_ORDER)
 
     # Procesar excedentes (nueva lógica del backend)
     excedentes_list = data.get("excedentes", [])
@@ -213,7 +263,7 @@ def sum_payments():
     # debe compararse solo con el excedente en efectivo, no con otros excedentes
     # Usar base_objetivo personalizado si se proporciona, sino usar el valor por defecto de Config
     base_objetivo_a_usar = cash_request.base_objetivo if cash_request.base_objetivo else Config.BASE_OBJETIVO
-    current_app.logger.info(f"Base objetivo a usar: {base_objetivo_a_usar}")
+    current_app.logger.info("Base objetivo a usar: %s", base_objetivo_a_usar)
 
     calculator = CashCalculator(base_objetivo=base_objetivo_a_usar)
     cash_result = calculator.procesar_cierre_completo(
@@ -255,22 +305,11 @@ def sum_payments():
         }
 
         # Si falla Alegra, devolver respuesta parcial con código 502
-        partial_response = {
-            "success": False,
-            "request_datetime": datetime_info['iso'],
-            "request_date": datetime_info['date'],
-            "request_time": datetime_info['time'],
-            "request_tz": tz_used,
-            "server_timestamp": get_colombia_timestamp(),
-            "timezone": "America/Bogota",
-            "date_requested": str(cash_request.date),
-            "username_used": Config.ALEGRA_USER,
-            "cash_count": cash_result,
-            "alegra": alegra_error
-        }
-
         current_app.logger.warning("Devolviendo respuesta parcial sin datos de Alegra")
-        return jsonify(partial_response), 502
+        return ojsonify(
+            _build_partial_response(cash_result, alegra_error, datetime_info, tz_used, cash_request.date),
+            502
+        )
 
     except Exception as e:
         current_app.logger.error(f"Error inesperado con Alegra: {str(e)}", exc_info=True)
@@ -279,21 +318,10 @@ def sum_payments():
         }
 
         # Respuesta parcial para errores inesperados
-        partial_response = {
-            "success": False,
-            "request_datetime": datetime_info['iso'],
-            "request_date": datetime_info['date'],
-            "request_time": datetime_info['time'],
-            "request_tz": tz_used,
-            "server_timestamp": get_colombia_timestamp(),
-            "timezone": "America/Bogota",
-            "date_requested": str(cash_request.date),
-            "username_used": Config.ALEGRA_USER,
-            "cash_count": cash_result,
-            "alegra": alegra_error
-        }
-
-        return jsonify(partial_response), 502
+        return ojsonify(
+            _build_partial_response(cash_result, alegra_error, datetime_info, tz_used, cash_request.date),
+            502
+        )
 
     # Validar el cierre comparando Alegra con lo registrado (incluye validación de efectivo y desfases)
     validacion_cierre = validar_cierre(
@@ -320,45 +348,52 @@ def sum_payments():
         desfases_procesados=desfases_procesados
     )
 
-    # Log resumen del cierre
-    current_app.logger.info("=" * 80)
-    current_app.logger.info("RESUMEN DEL CIERRE")
-    current_app.logger.info("-" * 80)
-    current_app.logger.info(f"Fecha: {cash_request.date}")
-    current_app.logger.info(f"Total efectivo: {cash_result['totals']['total_general_formatted']}")
-    current_app.logger.info(f"Base: {cash_result['base']['total_base_formatted']}")
-    current_app.logger.info(f"Estado de base: {cash_result['base']['mensaje_base']}")
-    current_app.logger.info(f"A consignar: {cash_result['consignar']['efectivo_para_consignar_final_formatted']}")
-    current_app.logger.info(f"Excedente: {cash_result['adjustments']['excedente_formatted']}")
-    current_app.logger.info(f"Gastos: {cash_result['adjustments']['gastos_operativos_formatted']}")
-    current_app.logger.info(f"Préstamos: {cash_result['adjustments']['prestamos_formatted']}")
-    if alegra_result:
-        current_app.logger.info(f"Total venta Alegra: {alegra_result['total_sale']['formatted']}")
-        for method, data in alegra_result['results'].items():
-            current_app.logger.info(f"  {data['label']}: {data['formatted']}")
-    current_app.logger.info("-" * 80)
-    current_app.logger.info(f"Validación del cierre: {validacion_cierre['validation_status'].upper()}")
-    current_app.logger.info(f"  {validacion_cierre['mensaje_validacion']}")
-
-    # Validación de EFECTIVO (crítica)
-    diff_efectivo = validacion_cierre['diferencias']['efectivo']
-    current_app.logger.info(
-        f"  Efectivo: Alegra {diff_efectivo['efectivo_alegra_formatted']} + "
-        f"Excedente {diff_efectivo['excedente_efectivo_formatted']} - "
-        f"Gastos {diff_efectivo['gastos_operativos_formatted']} = "
-        f"{diff_efectivo['suma_efectivo_ajustada_formatted']} vs "
-        f"Consignar {diff_efectivo['efectivo_para_consignar_formatted']} "
-        f"({'✓ VÁLIDO' if diff_efectivo['es_valido'] else '✗ NO COINCIDE'})"
-    )
-
-    # Otras diferencias
-    if validacion_cierre['diferencias']['transferencias']['es_significativa']:
-        current_app.logger.info(f"  Diferencia transferencias: {validacion_cierre['diferencias']['transferencias']['diferencia_formatted']}")
-    if validacion_cierre['diferencias']['datafono']['es_significativa']:
-        current_app.logger.info(f"  Diferencia datafono: {validacion_cierre['diferencias']['datafono']['diferencia_formatted']}")
-    current_app.logger.info("=" * 80)
-
-    return jsonify(response), 200
+    # Log resumen del cierre: un solo registro (multilínea) en lugar de uno por línea.
+    # Se omite por completo si INFO está deshabilitado
+    if current_app.logger.isEnabledFor(logging.INFO):
+        diferencias = validacion_cierre['diferencias']
+        diff_efectivo = diferencias['efectivo']
+        lines = [
+            "=" * 80,
+            "RESUMEN DEL CIERRE",
+            "-" * 80,
+            f"Fecha: {cash_request.date}",
+            f"Total efectivo: {cash_result['totals']['total_general_formatted']}",
+            f"Base: {cash_result['base']['total_base_formatted']}",
+            f"Estado de base: {cash_result['base']['mensaje_base']}",
+            f"A consignar: {cash_result['consignar']['efectivo_para_consignar_final_formatted']}",
+            f"Excedente: {cash_result['adjustments']['excedente_formatted']}",
+            f"Gastos: {cash_result['adjustments']['gastos_operativos_formatted']}",
+            f"Préstamos: {cash_result['adjustments']['prestamos_formatted']}",
+        ]
+        if alegra_result:
+            lines.append(f"Total venta Alegra: {alegra_result['total_sale']['formatted']}")
+            lines.extend(
+                f"  {method_data['label']}: {method_data['formatted']}"
+                for method_data in alegra_result['results'].values()
+            )
+        lines += [
+            "-" * 80,
+            f"Validación del cierre: {validacion_cierre['validation_status'].upper()}",
+            f"  {validacion_cierre['mensaje_validacion']}",
+            # Validación de EFECTIVO (crítica)
+            f"  Efectivo: Alegra {diff_efectivo['efectivo_alegra_formatted']} + "
+            f"Excedente {diff_efectivo['excedente_efectivo_formatted']} - "
+            f"Gastos {diff_efectivo['gastos_operativos_formatted']} = "
+            f"{diff_efectivo['suma_efectivo_ajustada_formatted']} vs "
+            f"Consignar {diff_efectivo['efectivo_para_consignar_formatted']} "
+            f"({'✓ VÁLIDO' if diff_efectivo['es_valido'] else '✗ NO COINCIDE'})",
+        ]
+        # Otras diferencias
+        if diferencias['transferencias']['es_significativa']:
+            lines.append(f"  Diferencia transferencias: {diferencias['transferencias']['diferencia_formatted']}")
+        if diferencias['datafono']['es_significativa']:
+            lines.append(f"  Diferencia datafono: {diferencias['datafono']['diferencia_formatted']}")
+        lines.append("=" * 80)
+
+        current_app.logger.info("\n".join(lines))
+
+    return ojsonify(response, 200)
 
 
 @bp.route('/monthly_sales', methods=['GET', 'OPTIONS'])
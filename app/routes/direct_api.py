@@ -4,27 +4,256 @@ Endpoints que usan las APIs no documentadas pero más completas
 Solo accesibles para usuarios con rol 'admin'
 """
 from flask import Blueprint, request, jsonify, current_app
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache, wraps
+from operator import methodcaller
+import base64
+import binascii
+import calendar
 import logging
+import math
+import re
+import threading
+
+import orjson
 
 from app.middlewares.auth import token_required, role_required
-from app.services.alegra_direct_client import AlegraDirectClient
-from app.config import Config
 from app.exceptions import AlegraConnectionError
 from app.utils.timezone import get_colombia_timestamp
+from app.utils.json_response import ojsonify
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('direct_api', __name__)
 
-# Inicializar cliente de API directa
-direct_client = AlegraDirectClient(
-    Config.ALEGRA_USER,
-    Config.ALEGRA_PASS,
-    Config.ALEGRA_API_BASE_URL,
-    Config.ALEGRA_TIMEOUT
-)
+# Pool compartido para lanzar en paralelo las consultas del dashboard a Alegra.
+# Las llamadas son I/O bound, así que los hilos solapan la latencia de red.
+_dashboard_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='alegra-dashboard')
+
+# Cache (por proceso) de los totales rápidos del dashboard. Los valores cambian
+# cada pocos minutos, así que varios usuarios abriendo el dashboard comparten
+# una sola consulta a Alegra durante el TTL. Solo se guardan respuestas exitosas.
+# Es el único cache de estos totales: get_sales_totals se llama con use_cache=False
+# para no sumar el TTL del cache del cliente, así que un total servido tiene como
+# máximo 45s (salvo el fallback 'stale' de _last_good_totals cuando Alegra falla).
+_totals_cache = TTLCache(maxsize=512, ttl=45)
+_totals_cache_lock = threading.Lock()
+
+# Último resultado exitoso por llave (hasta 24h). Si Alegra falla se sirve este
+# valor marcado como 'stale' en lugar de un 502.
+_last_good_totals = TTLCache(maxsize=512, ttl=24 * 60 * 60)
+
+# Reportes de inventario en segundo plano: el request responde 202 de inmediato y
+# el cliente consulta el estado. Los jobs (Future) se conservan 5 minutos, así que
+# peticiones idénticas dentro de esa ventana reutilizan el mismo resultado.
+_report_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='alegra-report')
+_report_jobs = TTLCache(maxsize=64, ttl=5 * 60)
+_report_jobs_lock = threading.Lock()
+
+
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+
 
+@lru_cache(maxsize=1024)
+def _is_iso_date(value: str) -> bool:
+    """Indica si value es una fecha válida en formato YYYY-MM-DD (memoizado por string)"""
+    match = _DATE_RE.fullmatch(value) if isinstance(value, str) else None
+    if not match:
+        return False
+    year, month, day = map(int, match.groups())
+    # Rango del día según el mes (sin construir un datetime)
+    return year >= 1 and 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+
+
+@lru_cache(maxsize=128)
+def _month_bounds(year: int, month: int) -> tuple:
+    """Retorna (primer_dia, ultimo_dia) del mes como strings YYYY-MM-DD"""
+    last_day = calendar.monthrange(year, month)[1]
+    return f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}"
+
+
+def _validate_dates(*params, required=False):
+    """
+    Decorador que valida parámetros de fecha (YYYY-MM-DD) en los query params
+
+    Args:
+        *params: Nombres de los parámetros de fecha
+        required: Si True, todos los parámetros son obligatorios
+
+    Los parámetros ausentes y opcionales se dejan pasar (el handler aplica sus
+    valores por defecto). El preflight CORS no se valida.
+    """
+    if len(params) == 1:
+        missing_message = f'El parámetro "{params[0]}" es requerido'
+    else:
+        names = ', '.join(f'"{p}"' for p in params[:-1])
+        missing_message = f'Los parámetros {names} y "{params[-1]}" son requeridos'
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method != 'OPTIONS':
+                values = [request.args.get(param) for param in params]
+
+                if required and not all(values):
+                    return jsonify({
+                        'success': False,
+                        'error': missing_message
+                    }), 400
+
+                if not all(map(_is_iso_date, filter(None, values))):
+                    return jsonify({
+                        'success': False,
+                        'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+                    }), 400
+
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def _days_in_range(from_date: str, to_date: str) -> int:
+    """
+    Cantidad de días (inclusive) entre dos fechas YYYY-MM-DD ya validadas
+
+    Se usa como 'limit' de /invoices/sales-totals agrupado por día, para que
+    rangos largos no se trunquen y los cortos no pidan registros de más.
+    """
+    days = (datetime.strptime(to_date, '%Y-%m-%d') - datetime.strptime(from_date, '%Y-%m-%d')).days + 1
+    return max(days, 1)
+
+
+_get_day_total = methodcaller('get', 'total', 0)
+
+
+def _sum_day_totals(sales_data: list) -> float:
+    """Suma los totales diarios de /invoices/sales-totals (iteración en C con map + fsum)"""
+    return math.fsum(map(float, map(_get_day_total, sales_data)))
+
+
+def _cached_totals(method, **kwargs):
+    """
+    Ejecuta un método de totales de direct_client usando el cache TTL
+
+    Args:
+        method: Método de AlegraDirectClient a invocar
+        **kwargs: Argumentos del método (forman parte de la llave del cache). Si el
+            método tiene cache propio en el cliente, pasar use_cache=False
+
+    Returns:
+        Resultado del método (desde cache si está vigente). Si Alegra falla y
+        existe un resultado exitoso anterior, se retorna ese con 'stale': True
+    """
+    key = (method.__name__, tuple(sorted(kwargs.items())))
+    with _totals_cache_lock:
+        cached = _totals_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = method(**kwargs)
+    with _totals_cache_lock:
+        if result.get('success'):
+            _totals_cache[key] = result
+            _last_good_totals[key] = result
+            return result
+        last_good = _last_good_totals.get(key)
+
+    if last_good is not None:
+        logger.warning("Alegra no respondió (%s); usando último valor conocido de %s", result.get('error'), key[0])
+        return {**last_good, 'stale': True}
+    return result
+
+
+def _cache_headers(result: dict) -> dict:
+    """Headers de la respuesta según el origen del resultado (X-Cache: STALE si es un valor viejo)"""
+    return {'X-Cache': 'STALE'} if result.get('stale') else {}
+
+
+def _inventory_report_params(args):
+    """
+    Lee y valida los parámetros del reporte de inventario
+
+    Returns:
+        (params, error): params es un dict para get_inventory_value_report_paginated;
+        error es un mensaje si algún límite no es válido
+
+    Raises:
+        ValueError: Si limit o pageSize no son enteros
+    """
+    params = {
+        'to_date': args.get('toDate') or datetime.now().strftime('%Y-%m-%d'),
+        'max_items': int(args.get('limit', 3000)),
+        'page_size': int(args.get('pageSize', 200)),
+        'query': args.get('query', '')
+    }
+
+    # Validar límites razonables
+    if params['max_items'] > 3000:
+        return params, 'El límite máximo es 3000 items'
+    if params['page_size'] > 300:
+        return params, 'El tamaño de página máximo es 300 items'
+    return params, None
+
+
+def _build_inventory_report(direct_client, params: dict, use_cache: bool = True) -> tuple:
+    """Consulta el reporte paginado en Alegra y arma (respuesta, status HTTP)"""
+    result = direct_client.get_inventory_value_report_paginated(**params, use_cache=use_cache)
+
+    if not result.get('success'):
+        return {
+            'success': False,
+            'error': 'Error obteniendo datos de Alegra',
+            'details': result.get('error')
+        }, 502
+
+    return {
+        'success': True,
+        'server_timestamp': get_colombia_timestamp(),
+        'data': result.get('data', []),
+        'metadata': result.get('metadata', {})
+    }, 200
+
+
+def _encode_report_job_id(params: dict) -> str:
+    """
+    El id del job codifica sus parámetros: cualquier worker puede atender el
+    polling (y relanzar el job si no lo tiene) sin estado compartido
+    """
+    raw = orjson.dumps([params['to_date'], params['max_items'], params['page_size'], params['query']])
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_report_job_id(job_id: str):
+    """Recupera los parámetros de un id de job (None si el id no es válido)"""
+    try:
+        raw = base64.urlsafe_b64decode(job_id + '=' * (-len(job_id) % 4))
+        to_date, max_items, page_size, query = orjson.loads(raw)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        return None
+
+    params = {'to_date': to_date, 'max_items': max_items, 'page_size': page_size, 'query': query}
+    # Mismas validaciones que al crear el job
+    if not (isinstance(to_date, str) and _is_iso_date(to_date) and isinstance(query, str)):
+        return None
+    if not (isinstance(max_items, int) and 0 < max_items <= 3000):
+        return None
+    if not (isinstance(page_size, int) and 0 < page_size <= 300):
+        return None
+    return params
+
+
+def _get_or_submit_report_job(direct_client, job_id: str, params: dict):
+    """Retorna el job (Future) del reporte, lanzándolo si aún no existe en este proceso"""
+    with _report_jobs_lock:
+        future = _report_jobs.get(job_id)
+        if future is None:
+            # El job ya se conserva 5 minutos: sin el cache del cliente, el reporte
+            # servido no tiene más de 5 minutos de antigüedad
+            future = _report_executor.submit(_build_inventory_report, direct_client, params, use_cache=False)
+            _report_jobs[job_id] = future
+    return future
 
 
 @bp.route('/api/direct/inventory/value-report', methods=['GET', 'OPTIONS'])
@@ -60,53 +289,20 @@ def get_inventory_value_report():
         return '', 204
 
     try:
-        # Obtener parámetros
-        to_date = request.args.get('toDate')
-        if not to_date:
-            to_date = datetime.now().strftime('%Y-%m-%d')
-        
-        max_items = int(request.args.get('limit', 3000))
-        page_size = int(request.args.get('pageSize', 200))
-        query = request.args.get('query', '')
-
-        # Validar límites razonables
-        if max_items > 3000:
+        params, error = _inventory_report_params(request.args)
+        if error:
             return jsonify({
                 'success': False,
-                'error': 'El límite máximo es 3000 items'
+                'error': error
             }), 400
 
-        if page_size > 300:
-            return jsonify({
-                'success': False,
-                'error': 'El tamaño de página máximo es 300 items'
-            }), 400
-
-        logger.info(f"Obteniendo inventory value report paginado - toDate: {to_date}, max_items: {max_items}, page_size: {page_size}")
-
-        # Obtener datos usando paginación automática
-        result = direct_client.get_inventory_value_report_paginated(
-            to_date=to_date,
-            max_items=max_items,
-            page_size=page_size,
-            query=query
+        logger.info(
+            "Obteniendo inventory value report paginado - toDate: %s, max_items: %s, page_size: %s",
+            params['to_date'], params['max_items'], params['page_size']
         )
 
-        if not result.get('success'):
-            return jsonify({
-                'success': False,
-                'error': 'Error obteniendo datos de Alegra',
-                'details': result.get('error')
-            }), 502
-
-        response = {
-            'success': True,
-            'server_timestamp': get_colombia_timestamp(),
-            'data': result.get('data', []),
-            'metadata': result.get('metadata', {})
-        }
-
-        return jsonify(response), 200
+        body, status = _build_inventory_report(current_app.extensions['alegra_direct'], params)
+        return ojsonify(body, status)
 
     except ValueError as e:
         return jsonify({
@@ -122,9 +318,118 @@ def get_inventory_value_report():
         }), 500
 
 
+@bp.route('/api/direct/inventory/value-report/jobs', methods=['POST', 'OPTIONS'])
+@token_required
+@role_required('admin')
+def submit_inventory_value_report_job():
+    """
+    Lanza el reporte de valor de inventario en segundo plano
+
+    Acepta los mismos query parameters que GET /api/direct/inventory/value-report y
+    responde 202 de inmediato con la URL para consultar el estado del job.
+    Peticiones con los mismos parámetros comparten el job durante 5 minutos.
+
+    Example:
+        POST /api/direct/inventory/value-report/jobs?toDate=2025-12-10&limit=3000
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        params, error = _inventory_report_params(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Parámetro inválido: {str(e)}'
+        }), 400
+
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    if not _is_iso_date(params['to_date']):
+        return jsonify({
+            'success': False,
+            'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+        }), 400
+
+    job_id = _encode_report_job_id(params)
+    _get_or_submit_report_job(current_app.extensions['alegra_direct'], job_id, params)
+
+    logger.info(
+        "Job de inventory value report lanzado - toDate: %s, max_items: %s",
+        params['to_date'], params['max_items']
+    )
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/api/direct/inventory/value-report/jobs/{job_id}'
+    }), 202
+
+
+@bp.route('/api/direct/inventory/value-report/jobs/<job_id>', methods=['GET', 'OPTIONS'])
+@token_required
+@role_required('admin')
+def get_inventory_value_report_job(job_id):
+    """
+    Consulta el estado de un job de reporte de inventario
+
+    Returns:
+        JSON con status: queued | running | done | failed. Cuando el status es
+        done, incluye el reporte completo en 'result'. Un job_id que no
+        corresponde a parámetros válidos responde 400.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    params = _decode_report_job_id(job_id)
+    if params is None:
+        return jsonify({
+            'success': False,
+            'error': 'job_id inválido'
+        }), 400
+
+    future = _get_or_submit_report_job(current_app.extensions['alegra_direct'], job_id, params)
+
+    if not future.done():
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'running' if future.running() else 'queued'
+        }), 200
+
+    try:
+        body, status = future.result()
+    except Exception as e:
+        logger.error("Error en job de inventory value report %s: %s", job_id, e)
+        with _report_jobs_lock:
+            _report_jobs.pop(job_id, None)
+        return jsonify({
+            'success': False,
+            'job_id': job_id,
+            'status': 'failed',
+            'error': 'Error interno del servidor'
+        }), 200
+
+    if status != 200:
+        # No conservar errores de Alegra: el siguiente intento relanza el job
+        with _report_jobs_lock:
+            _report_jobs.pop(job_id, None)
+
+    return ojsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'done',
+        'result': body
+    }, 200)
+
+
 @bp.route('/api/direct/sales/totals', methods=['GET', 'OPTIONS'])
 @token_required
 @role_required('admin')
+@_validate_dates('from', 'to', required=True)
 def get_sales_totals():
     """
     Obtiene totales de ventas agrupados por día o mes desde la API directa
@@ -151,22 +456,6 @@ def get_sales_totals():
         from_date = request.args.get('from')
         to_date = request.args.get('to')
         
-        if not from_date or not to_date:
-            return jsonify({
-                'success': False,
-                'error': 'Los parámetros "from" y "to" son requeridos'
-            }), 400
-
-        # Validar formato de fechas
-        try:
-            datetime.strptime(from_date, '%Y-%m-%d')
-            datetime.strptime(to_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-            }), 400
-
         group_by = request.args.get('groupBy', 'day')
         limit = int(request.args.get('limit', 10))
         start = int(request.args.get('start', 0))
@@ -178,7 +467,9 @@ def get_sales_totals():
                 'error': 'groupBy debe ser "day" o "month"'
             }), 400
 
-        logger.info(f"Obteniendo sales totals - from: {from_date}, to: {to_date}, groupBy: {group_by}")
+        logger.info("Obteniendo sales totals - from: %s, to: %s, groupBy: %s", from_date, to_date, group_by)
+
+        direct_client = current_app.extensions['alegra_direct']
 
         # Obtener datos de la API directa
         result = direct_client.get_sales_totals(
@@ -222,6 +513,7 @@ def get_sales_totals():
 @bp.route('/api/direct/sales/documents', methods=['GET', 'OPTIONS'])
 @token_required
 @role_required('admin')
+@_validate_dates('from', 'to', required=True)
 def get_sales_documents():
     """
     Obtiene TODOS los documentos de ventas para un rango de fechas con paginación automática
@@ -248,23 +540,9 @@ def get_sales_documents():
         from_date = request.args.get('from')
         to_date = request.args.get('to')
 
-        if not from_date or not to_date:
-            return jsonify({
-                'success': False,
-                'error': 'Los parámetros "from" y "to" son requeridos'
-            }), 400
-
-        # Validar formato de fechas
-        try:
-            datetime.strptime(from_date, '%Y-%m-%d')
-            datetime.strptime(to_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-            }), 400
+        logger.info("Obteniendo TODAS las facturas - from: %s, to: %s", from_date, to_date)
 
-        logger.info(f"Obteniendo TODAS las facturas - from: {from_date}, to: {to_date}")
+        direct_client = current_app.extensions['alegra_direct']
 
         # Usar el nuevo método que obtiene TODAS las facturas con paginación automática
         result = direct_client.get_all_invoices_for_date_range(
@@ -286,9 +564,10 @@ def get_sales_documents():
             'metadata': result.get('metadata', {})
         }
 
-        logger.info(f"Retornando {len(result.get('data', []))} facturas en total")
+        logger.info("Retornando %s facturas en total", len(result.get('data', [])))
 
-        return jsonify(response), 200
+        # orjson serializa miles de facturas varias veces más rápido que jsonify
+        return ojsonify(response, 200)
 
     except ValueError as e:
         return jsonify({
@@ -306,6 +585,7 @@ def get_sales_documents():
 
 @bp.route('/api/sales/quick-summary', methods=['GET', 'OPTIONS'])
 @token_required
+@_validate_dates('from', 'to', required=True)
 def get_quick_sales_summary():
     """
     Obtiene un resumen rápido del total de ventas para un rango de fechas
@@ -345,32 +625,20 @@ def get_quick_sales_summary():
         from_date = request.args.get('from')
         to_date = request.args.get('to')
 
-        if not from_date or not to_date:
-            return jsonify({
-                'success': False,
-                'error': 'Los parámetros "from" y "to" son requeridos'
-            }), 400
-
-        # Validar formato de fechas
-        try:
-            datetime.strptime(from_date, '%Y-%m-%d')
-            datetime.strptime(to_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-            }), 400
+        logger.info("Quick summary - from: %s, to: %s", from_date, to_date)
 
-        logger.info(f"Quick summary - from: {from_date}, to: {to_date}")
+        direct_client = current_app.extensions['alegra_direct']
 
         # Obtener totales de ventas usando el endpoint rápido de Alegra
         # Este endpoint retorna totales agregados sin detalles de facturas (mucho más rápido)
-        result = direct_client.get_sales_totals(
+        result = _cached_totals(
+            direct_client.get_sales_totals,
             from_date=from_date,
             to_date=to_date,
             group_by='day',  # Agrupa por día
-            limit=100,       # Suficiente para 100 días
-            start=0
+            limit=_days_in_range(from_date, to_date),  # Un registro por día del rango
+            start=0,
+            use_cache=False  # _totals_cache ya acota la frescura
         )
 
         if not result.get('success'):
@@ -383,13 +651,13 @@ def get_quick_sales_summary():
         # Calcular el total de ventas sumando los totales de cada día
         # La respuesta tiene estructura: [{'date': '2025-12-10', 'total': 3330350, ...}, ...]
         sales_data = result.get('data', [])
-        total_sales = sum(float(day.get('total', 0)) for day in sales_data)
+        total_sales = _sum_day_totals(sales_data)
 
         # Formatear el total
         from app.utils.formatters import format_cop
         total_sales_formatted = format_cop(total_sales)
 
-        logger.info(f"Quick summary calculado: {total_sales_formatted} ({len(sales_data)} días procesados)")
+        logger.info("Quick summary calculado: %s (%s días procesados)", total_sales_formatted, len(sales_data))
 
         return jsonify({
             'success': True,
@@ -400,10 +668,10 @@ def get_quick_sales_summary():
                 'from': from_date,
                 'to': to_date
             }
-        }), 200
+        }), 200, _cache_headers(result)
 
     except ValueError as e:
-        logger.error(f"Error de validación en quick summary: {str(e)}")
+        logger.error("Error de validación en quick summary: %s", e)
         return jsonify({
             'success': False,
             'error': f'Parámetro inválido: {str(e)}'
@@ -419,6 +687,7 @@ def get_quick_sales_summary():
 
 @bp.route('/api/inventory/quick-total', methods=['GET', 'OPTIONS'])
 @token_required
+@_validate_dates('to_date')
 def get_quick_inventory_total():
     """
     Obtiene el total del valor del inventario para una fecha específica
@@ -461,19 +730,13 @@ def get_quick_inventory_total():
             colombia_now = get_colombia_now()
             to_date = colombia_now.strftime('%Y-%m-%d')
 
-        # Validar formato de fecha
-        try:
-            datetime.strptime(to_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-            }), 400
+        logger.info("Quick inventory total - to_date: %s", to_date)
 
-        logger.info(f"Quick inventory total - to_date: {to_date}")
+        direct_client = current_app.extensions['alegra_direct']
 
         # Obtener total del inventario usando el endpoint rápido de Alegra
-        result = direct_client.get_inventory_value_totals(
+        result = _cached_totals(
+            direct_client.get_inventory_value_totals,
             to_date=to_date,
             query="",
             force_inventory_parallel=False
@@ -497,17 +760,17 @@ def get_quick_inventory_total():
         from app.utils.formatters import format_cop
         total_value_formatted = format_cop(total_value)
 
-        logger.info(f"✅ Quick inventory total calculado: {total_value_formatted}")
+        logger.info("✅ Quick inventory total calculado: %s", total_value_formatted)
 
         return jsonify({
             'success': True,
             'total_value': total_value,
             'total_value_formatted': total_value_formatted,
             'to_date': to_date
-        }), 200
+        }), 200, _cache_headers(result)
 
     except ValueError as e:
-        logger.error(f"Error de validación en quick inventory total: {str(e)}")
+        logger.error("Error de validación en quick inventory total: %s", e)
         return jsonify({
             'success': False,
             'error': f'Parámetro inválido: {str(e)}'
@@ -523,6 +786,7 @@ def get_quick_inventory_total():
 
 @bp.route('/api/bills/open-totals', methods=['GET', 'OPTIONS'])
 @token_required
+@_validate_dates('from_date', 'to_date')
 def get_bills_open_totals():
     """
     Obtiene el total de cuentas por pagar pendientes para un rango de fechas
@@ -565,34 +829,18 @@ def get_bills_open_totals():
         from_date = request.args.get('from_date')
         to_date = request.args.get('to_date')
 
-        if not from_date:
-            # Primer día del mes actual
-            year = colombia_now.year
-            month = colombia_now.month
-            from_date = f"{year}-{month:02d}-01"
+        # Por defecto, primer y último día del mes actual
+        month_start, month_end = _month_bounds(colombia_now.year, colombia_now.month)
+        from_date = from_date or month_start
+        to_date = to_date or month_end
 
-        if not to_date:
-            # Último día del mes actual
-            import calendar
-            year = colombia_now.year
-            month = colombia_now.month
-            last_day = calendar.monthrange(year, month)[1]
-            to_date = f"{year}-{month:02d}-{last_day:02d}"
-
-        # Validar formato de fechas
-        try:
-            datetime.strptime(from_date, '%Y-%m-%d')
-            datetime.strptime(to_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-            }), 400
+        logger.info("Bills open totals - from: %s, to: %s", from_date, to_date)
 
-        logger.info(f"Bills open totals - from: {from_date}, to: {to_date}")
+        direct_client = current_app.extensions['alegra_direct']
 
         # Obtener total de cuentas por pagar usando el endpoint rápido de Alegra
-        result = direct_client.get_bills_open_totals(
+        result = _cached_totals(
+            direct_client.get_bills_open_totals,
             from_date=from_date,
             to_date=to_date
         )
@@ -614,7 +862,7 @@ def get_bills_open_totals():
         from app.utils.formatters import format_cop
         missing_amount_formatted = format_cop(missing_amount)
 
-        logger.info(f"✅ Bills open totals calculado: {missing_amount_formatted} ({total_documents} documentos)")
+        logger.info("✅ Bills open totals calculado: %s (%s documentos)", missing_amount_formatted, total_documents)
 
         return jsonify({
             'success': True,
@@ -623,10 +871,10 @@ def get_bills_open_totals():
             'total_documents': total_documents,
             'from_date': from_date,
             'to_date': to_date
-        }), 200
+        }), 200, _cache_headers(result)
 
     except ValueError as e:
-        logger.error(f"Error de validación en bills open totals: {str(e)}")
+        logger.error("Error de validación en bills open totals: %s", e)
         return jsonify({
             'success': False,
             'error': f'Parámetro inválido: {str(e)}'
@@ -638,3 +886,141 @@ def get_bills_open_totals():
             'error': 'Error interno del servidor',
             'details': str(e)
         }), 500
+
+
+@bp.route('/api/dashboard/summary', methods=['GET', 'OPTIONS'])
+@token_required
+@_validate_dates('from', 'to', 'bills_from', 'bills_to')
+def get_dashboard_summary():
+    """
+    Obtiene en una sola llamada los totales del dashboard
+    (ventas, valor del inventario y cuentas por pagar)
+
+    Las tres consultas a Alegra se ejecutan en paralelo, por lo que el tiempo
+    de respuesta es el de la consulta más lenta y no la suma de las tres.
+
+    Query Parameters:
+        - from (str, optional): Fecha de inicio de ventas (YYYY-MM-DD). Por defecto hoy
+        - to (str, optional): Fecha de fin de ventas y fecha del inventario (YYYY-MM-DD). Por defecto hoy
+        - bills_from (str, optional): Fecha de inicio de cuentas por pagar. Por defecto primer día del mes actual
+        - bills_to (str, optional): Fecha de fin de cuentas por pagar. Por defecto último día del mes actual
+
+    Example:
+        GET /api/dashboard/summary?from=2026-01-01&to=2026-01-21
+
+    Response:
+        {
+            "success": true,
+            "sales": {"success": true, "total_sales": 1234567, ...},
+            "inventory": {"success": true, "total_value": 123456789, ...},
+            "bills": {"success": true, "missing_amount": 13699200, ...}
+        }
+
+    Si alguna de las consultas falla, su sección retorna success=false con el
+    error y las demás se entregan normalmente. Solo si fallan las tres se
+    responde 502. Una sección con stale=true trae el último valor conocido
+    porque Alegra no respondió.
+    """
+    # Manejar preflight CORS
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        from app.utils.timezone import get_colombia_now
+        from app.utils.formatters import format_cop
+
+        colombia_now = get_colombia_now()
+        today = colombia_now.strftime('%Y-%m-%d')
+        month_start, month_end = _month_bounds(colombia_now.year, colombia_now.month)
+
+        from_date = request.args.get('from') or today
+        to_date = request.args.get('to') or today
+        bills_from = request.args.get('bills_from') or month_start
+        bills_to = request.args.get('bills_to') or month_end
+
+        logger.info(
+            "Dashboard summary - ventas: %s a %s, inventario: %s, cuentas por pagar: %s a %s",
+            from_date, to_date, to_date, bills_from, bills_to
+        )
+
+        direct_client = current_app.extensions['alegra_direct']
+
+        # Lanzar las tres consultas en paralelo
+        sales_future = _dashboard_executor.submit(
+            _cached_totals, direct_client.get_sales_totals,
+            from_date=from_date, to_date=to_date, group_by='day',
+            limit=_days_in_range(from_date, to_date), start=0, use_cache=False
+        )
+        inventory_future = _dashboard_executor.submit(
+            _cached_totals, direct_client.get_inventory_value_totals,
+            to_date=to_date, query="", force_inventory_parallel=False
+        )
+        bills_future = _dashboard_executor.submit(
+            _cached_totals, direct_client.get_bills_open_totals,
+            from_date=bills_from, to_date=bills_to
+        )
+
+        sales_result = sales_future.result()
+        inventory_result = inventory_future.result()
+        bills_result = bills_future.result()
+
+        # Ventas
+        if sales_result.get('success'):
+            sales_data = sales_result.get('data', [])
+            total_sales = _sum_day_totals(sales_data)
+            sales = {
+                'success': True,
+                'total_sales': total_sales,
+                'total_sales_formatted': format_cop(total_sales),
+                'days_count': len(sales_data),
+                'date_range': {'from': from_date, 'to': to_date},
+                'stale': bool(sales_result.get('stale'))
+            }
+        else:
+            sales = {'success': False, 'error': sales_result.get('error')}
+
+        # Inventario
+        if inventory_result.get('success'):
+            total_value = float(inventory_result.get('data', {}).get('total', 0))
+            inventory = {
+                'success': True,
+                'total_value': total_value,
+                'total_value_formatted': format_cop(total_value),
+                'to_date': to_date,
+                'stale': bool(inventory_result.get('stale'))
+            }
+        else:
+            inventory = {'success': False, 'error': inventory_result.get('error')}
+
+        # Cuentas por pagar
+        if bills_result.get('success'):
+            bills_data = bills_result.get('data', {})
+            missing_amount = float(bills_data.get('missingAmount', 0))
+            bills = {
+                'success': True,
+                'missing_amount': missing_amount,
+                'missing_amount_formatted': format_cop(missing_amount),
+                'total_documents': int(bills_data.get('totalDocuments', 0)),
+                'from_date': bills_from,
+                'to_date': bills_to,
+                'stale': bool(bills_result.get('stale'))
+            }
+        else:
+            bills = {'success': False, 'error': bills_result.get('error')}
+
+        any_success = sales['success'] or inventory['success'] or bills['success']
+
+        return jsonify({
+            'success': any_success,
+            'sales': sales,
+            'inventory': inventory,
+            'bills': bills
+        }), 200 if any_success else 502
+
+    except Exception as e:
+        logger.exception("Error inesperado en dashboard summary")
+        return jsonify({
+            'success': False,
+            'error': 'Error interno del servidor',
+            'details': str(e)
+        }), 500
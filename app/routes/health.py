@@ -3,12 +3,56 @@ Health check endpoint
 """
 from flask import Blueprint, jsonify, current_app
 from flasgger import swag_from
+from cachetools import TTLCache
+import threading
 
 from app.config import Config
 from app.services.alegra_client import AlegraClient
 
 bp = Blueprint('health', __name__)
 
+# Tiempo (segundos) durante el cual se reutiliza el último estado de Alegra
+ALEGRA_STATUS_TTL = 10
+
+# Cliente compartido entre probes: reutiliza la sesión HTTP (TCP/TLS)
+_alegra_client = None
+_alegra_status_cache = TTLCache(maxsize=1, ttl=ALEGRA_STATUS_TTL)
+_alegra_lock = threading.Lock()
+
+
+def _get_alegra_client():
+    """Devuelve el cliente de Alegra del proceso, creándolo la primera vez"""
+    global _alegra_client
+    with _alegra_lock:
+        if _alegra_client is None:
+            _alegra_client = AlegraClient(
+                Config.ALEGRA_USER,
+                Config.ALEGRA_PASS,
+                Config.ALEGRA_API_BASE_URL,
+                timeout=5
+            )
+        return _alegra_client
+
+
+def _cached_alegra_status():
+    """Estado de Alegra cacheado por proceso (evita un round-trip por cada probe)"""
+    with _alegra_lock:
+        status = _alegra_status_cache.get('alegra')
+    if status is not None:
+        return status
+
+    # La consulta a Alegra se hace fuera del lock para no bloquear otros probes
+    try:
+        is_healthy = _get_alegra_client().health_check()
+        status = "connected" if is_healthy else "disconnected"
+    except Exception as e:
+        current_app.logger.warning(f"Error en health check de Alegra: {e}")
+        status = "error"
+
+    with _alegra_lock:
+        _alegra_status_cache['alegra'] = status
+    return status
+
 
 @bp.route('/health', methods=['GET'])
 def health_check():
@@ -43,22 +87,12 @@ def health_check():
     }
 
     # Check opcional de Alegra (sin bloquear)
-    try:
-        if Config.ALEGRA_USER and Config.ALEGRA_PASS:
-            client = AlegraClient(
-                Config.ALEGRA_USER,
-                Config.ALEGRA_PASS,
-                Config.ALEGRA_API_BASE_URL,
-                timeout=5
-            )
-            is_healthy = client.health_check()
-            status["alegra"] = "connected" if is_healthy else "disconnected"
-        else:
-            status["alegra"] = "not_configured"
-    except Exception as e:
-        current_app.logger.warning(f"Error en health check de Alegra: {e}")
-        status["alegra"] = "error"
-        status["status"] = "degraded"
+    if Config.ALEGRA_USER and Config.ALEGRA_PASS:
+        status["alegra"] = _cached_alegra_status()
+        if status["alegra"] == "error":
+            status["status"] = "degraded"
+    else:
+        status["alegra"] = "not_configured"
 
     return jsonify(status), 200
 
@@ -2,8 +2,11 @@
 Rutas para códigos y precios KOAJ
 Accesible para todos los usuarios autenticados (admin y sales)
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+import hashlib
 import logging
+import orjson
+from sqlalchemy import select, update
 
 from app.middlewares.auth import token_required, role_required
 from app.models.user import db
@@ -64,6 +67,11 @@ BARCODE_GUIDE = {
 }
 
 
+# La guía es estática: se serializa una sola vez al importar el módulo
+_GUIDE_BODY = orjson.dumps({'success': True, 'guide': BARCODE_GUIDE})
+_GUIDE_ETAG = hashlib.sha1(_GUIDE_BODY).hexdigest()
+
+
 @bp.route('/api/koaj-codes', methods=['GET', 'OPTIONS'])
 @token_required
 def list_koaj_codes():
@@ -95,35 +103,25 @@ def list_koaj_codes():
         return '', 204
 
     try:
-        query = KoajCode.query.filter_by(is_active=True)
+        # Ya vienen ordenados por código numérico desde el cache
+        codes = KoajCode.get_active_codes()
 
-        # Filtrar por búsqueda
-        search = request.args.get('search', '').strip()
+        # Filtrar por búsqueda (código o categoría, sin distinguir mayúsculas)
+        search = request.args.get('search', '').strip().lower()
         if search:
-            search_pattern = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    KoajCode.code.ilike(search_pattern),
-                    KoajCode.category.ilike(search_pattern)
-                )
-            )
+            codes = [
+                c for c in codes
+                if search in c['code'].lower() or search in c['category'].lower()
+            ]
 
         # Filtrar por género
         applies_to = request.args.get('applies_to', '').strip().lower()
         if applies_to and applies_to != 'todos':
-            query = query.filter(
-                db.or_(
-                    KoajCode.applies_to == applies_to,
-                    KoajCode.applies_to == 'todos'
-                )
-            )
-
-        # Ordenar por código numérico
-        codes = query.order_by(KoajCode.code.cast(db.Integer)).all()
+            codes = [c for c in codes if c['applies_to'] in (applies_to, 'todos')]
 
         return jsonify({
             'success': True,
-            'codes': [code.to_dict() for code in codes],
+            'codes': codes,
             'total': len(codes)
         }), 200
 
@@ -154,10 +152,12 @@ def get_code_guide():
     if request.method == 'OPTIONS':
         return '', 204
 
-    return jsonify({
-        'success': True,
-        'guide': BARCODE_GUIDE
-    }), 200
+    response = current_app.response_class(_GUIDE_BODY, status=200, mimetype='application/json')
+    response.set_etag(_GUIDE_ETAG)
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    # Responde 304 si el cliente ya tiene esta versión (If-None-Match)
+    return response.make_conditional(request)
 
 
 @bp.route('/api/koaj-codes', methods=['POST', 'OPTIONS'])
@@ -219,30 +219,32 @@ def create_koaj_code():
                 'message': 'Código y categoría son requeridos'
             }), 400
 
-        # Verificar si el código ya existe
-        existing = KoajCode.query.filter_by(code=code).first()
-        if existing:
-            return jsonify({
-                'success': False,
-                'message': f'El código {code} ya existe'
-            }), 409
-
-        new_code = KoajCode(
+        # Un solo INSERT ... ON CONFLICT DO NOTHING: None si el código ya existe
+        new_code = KoajCode.insert_if_absent(
             code=code,
             category=category,
             description=data.get('description', '').strip() or None,
             applies_to=data.get('applies_to', 'todos').strip().lower()
         )
+        if new_code is None:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'El código {code} ya existe'
+            }), 409
 
-        db.session.add(new_code)
+        code_dict = new_code.to_dict()
         db.session.commit()
+        # Después del commit: invalidar antes dejaría que otra petición recargue
+        # el catálogo sin el código nuevo
+        KoajCode.invalidate_cache()
 
         logger.info(f"Código KOAJ creado: {code} - {category}")
 
         return jsonify({
             'success': True,
             'message': 'Código creado exitosamente',
-            'code': new_code.to_dict()
+            'code': code_dict
         }), 201
 
     except Exception as e:
@@ -295,13 +297,6 @@ def update_koaj_code(code_id):
         return '', 204
 
     try:
-        koaj_code = KoajCode.query.get(code_id)
-        if not koaj_code:
-            return jsonify({
-                'success': False,
-                'message': 'Código no encontrado'
-            }), 404
-
         data = request.get_json()
         if not data:
             return jsonify({
@@ -309,40 +304,60 @@ def update_koaj_code(code_id):
                 'message': 'No se recibieron datos'
             }), 400
 
+        # Solo los campos presentes en la petición
+        changes = {}
+
         if 'code' in data and data['code']:
             new_code = data['code'].strip()
             # Verificar que no exista otro código con el mismo valor
-            existing = KoajCode.query.filter(
-                KoajCode.code == new_code,
-                KoajCode.id != code_id
+            existing = db.session.execute(
+                select(KoajCode.id).where(KoajCode.code == new_code, KoajCode.id != code_id)
             ).first()
             if existing:
                 return jsonify({
                     'success': False,
                     'message': f'El código {new_code} ya está en uso'
                 }), 409
-            koaj_code.code = new_code
+            changes['code'] = new_code
 
         if 'category' in data and data['category']:
-            koaj_code.category = data['category'].strip()
+            changes['category'] = data['category'].strip()
 
         if 'description' in data:
-            koaj_code.description = data['description'].strip() if data['description'] else None
+            changes['description'] = data['description'].strip() if data['description'] else None
 
         if 'applies_to' in data and data['applies_to']:
-            koaj_code.applies_to = data['applies_to'].strip().lower()
+            changes['applies_to'] = data['applies_to'].strip().lower()
 
         if 'is_active' in data:
-            koaj_code.is_active = bool(data['is_active'])
+            changes['is_active'] = bool(data['is_active'])
+
+        if changes:
+            # Un solo UPDATE ... RETURNING (sin SELECT previo)
+            koaj_code = db.session.execute(
+                update(KoajCode).where(KoajCode.id == code_id).values(**changes).returning(KoajCode)
+            ).scalar_one_or_none()
+        else:
+            koaj_code = db.session.get(KoajCode, code_id)
 
+        if not koaj_code:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': 'Código no encontrado'
+            }), 404
+
+        code_dict = koaj_code.to_dict()
         db.session.commit()
+        # Los UPDATE masivos no disparan los eventos del mapper
+        KoajCode.invalidate_cache()
 
-        logger.info(f"Código KOAJ actualizado: {koaj_code.code}")
+        logger.info(f"Código KOAJ actualizado: {code_dict['code']}")
 
         return jsonify({
             'success': True,
             'message': 'Código actualizado exitosamente',
-            'code': koaj_code.to_dict()
+            'code': code_dict
         }), 200
 
     except Exception as e:
@@ -380,17 +395,22 @@ def delete_koaj_code(code_id):
         return '', 204
 
     try:
-        koaj_code = KoajCode.query.get(code_id)
-        if not koaj_code:
+        # Un solo UPDATE ... RETURNING (sin SELECT previo)
+        row = db.session.execute(
+            update(KoajCode).where(KoajCode.id == code_id).values(is_active=False).returning(KoajCode.code)
+        ).first()
+        if row is None:
+            db.session.rollback()
             return jsonify({
                 'success': False,
                 'message': 'Código no encontrado'
             }), 404
 
-        koaj_code.is_active = False
         db.session.commit()
+        # Los UPDATE masivos no disparan los eventos del mapper
+        KoajCode.invalidate_cache()
 
-        logger.info(f"Código KOAJ desactivado: {koaj_code.code}")
+        logger.info(f"Código KOAJ desactivado: {row.code}")
 
         return jsonify({
             'success': True,
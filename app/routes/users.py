@@ -2,24 +2,129 @@
 Rutas de gestion de usuarios
 Solo accesible para administradores
 """
-from flask import Blueprint, request, jsonify, g
-import bcrypt
+from flask import Blueprint, request, g
+import hashlib
 import re
 import logging
+import math
+from operator import attrgetter
+import os
+import threading
 from datetime import datetime
 
+from cachetools import TTLCache
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
 from app.middlewares.auth import token_required, role_required, get_current_user
 from app.models.user import db, User
+from app.services.password_service import PasswordService
+from app.utils.json_response import ojsonify
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('users', __name__)
 
 
+# Campos del usuario serializado (mismo orden en el SELECT de list_users)
+_USER_KEYS = ('id', 'email', 'name', 'role', 'is_active', 'created_at')
+_USER_COLUMNS = tuple(getattr(User, key) for key in _USER_KEYS)
+_get_user_fields = attrgetter(*_USER_KEYS)
+
+# Roles validos y campos requeridos al crear un usuario
+_VALID_ROLES = frozenset({'admin', 'sales'})
+_REQUIRED_CREATE_FIELDS = ('email', 'password', 'name', 'role')
+
+# Contraseñas comunes (SHA-256 en minúsculas), cargadas una vez al importar.
+# El archivo se genera con scripts/build_weak_passwords.py (ahí está la lista fuente).
+_WEAK_PASSWORDS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'weak_passwords.txt')
+
+
+def _load_weak_passwords(path: str) -> frozenset:
+    """Lee los hashes de contraseñas comunes (ignora comentarios y líneas vacías)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return frozenset(
+                line.strip() for line in f
+                if line.strip() and not line.startswith('#')
+            )
+    except OSError:
+        logger.warning("No se pudo cargar la lista de contrasenas comunes: %s", path)
+        return frozenset()
+
+
+_WEAK_PASSWORD_HASHES = _load_weak_passwords(_WEAK_PASSWORDS_FILE)
+
+# Paginacion de list_users
+DEFAULT_USERS_PER_PAGE = 50
+MAX_USERS_PER_PAGE = 100
+
+# Cache corto (por proceso) del usuario serializado para get_user. Las rutas que
+# modifican un usuario lo invalidan; el TTL acota cambios hechos en otros workers.
+_user_cache = TTLCache(maxsize=256, ttl=30)
+_user_cache_lock = threading.Lock()
+
+# Patrones precompilados de validación
+_EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+_DIGIT_RE = re.compile(r'\d')
+
+# Clase de cada byte ASCII como bit: 1 = mayuscula, 2 = minuscula, 4 = digito.
+# Los bytes >= 128 (partes de caracteres UTF-8 multibyte) no suman ninguna clase.
+_UPPER, _LOWER, _DIGIT = 1, 2, 4
+_CLASS_TBL = bytes(
+    (_UPPER if 65 <= i <= 90 else 0) | (_LOWER if 97 <= i <= 122 else 0) | (_DIGIT if 48 <= i <= 57 else 0)
+    for i in range(256)
+)
+_ALL_CLASSES = _UPPER | _LOWER | _DIGIT
+
+
+@bp.before_request
+def _short_circuit_preflight():
+    """Responde el preflight CORS antes de la cadena de decoradores (token/rol)"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+
+def _user_to_dict(values) -> dict:
+    """Arma el dict del usuario desde los valores de _USER_KEYS (created_at en ISO 8601)"""
+    user_dict = dict(zip(_USER_KEYS, values))
+    created_at = user_dict['created_at']
+    user_dict['created_at'] = created_at.isoformat() if created_at else None
+    return user_dict
+
+
+def _get_user_dict(user_id: int):
+    """Retorna el usuario serializado (desde el cache si está vigente) o None"""
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+
+    user_dict = _user_to_dict(_get_user_fields(user))
+    with _user_cache_lock:
+        _user_cache[user_id] = user_dict
+    return user_dict
+
+
+def _invalidate_user(user_id: int) -> None:
+    """Descarta el usuario del cache de get_user"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
 def validate_email(email: str) -> bool:
     """Valida el formato del email"""
-    pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-    return bool(re.match(pattern, email))
+    # Filtros baratos antes del regex: longitud (a@b.c .. 254) y una sola arroba
+    n = len(email)
+    if n < 5 or n > 254 or email.count('@') != 1:
+        return False
+    if '.' not in email.partition('@')[2]:
+        return False
+    return bool(_EMAIL_RE.match(email))
 
 
 def validate_password(password: str) -> tuple:
@@ -31,12 +136,24 @@ def validate_password(password: str) -> tuple:
         return False, "La contrasena debe tener al menos 8 caracteres"
     if len(password) > 128:
         return False, "La contrasena no puede exceder 128 caracteres"
-    if not re.search(r'[A-Z]', password):
+
+    # Una sola pasada: translate (en C) clasifica cada byte y se acumulan los bits
+    seen = 0
+    for char_class in password.encode('utf-8', 'ignore').translate(_CLASS_TBL):
+        seen |= char_class
+        if seen == _ALL_CLASSES:
+            break
+
+    if not seen & _UPPER:
         return False, "La contrasena debe contener al menos una mayuscula"
-    if not re.search(r'[a-z]', password):
+    if not seen & _LOWER:
         return False, "La contrasena debe contener al menos una minuscula"
-    if not re.search(r'\d', password):
+    # \d también acepta dígitos Unicode (no ASCII)
+    if not seen & _DIGIT and (password.isascii() or not _DIGIT_RE.search(password)):
         return False, "La contrasena debe contener al menos un numero"
+    # Lista de contraseñas comunes: se rechazan antes de pagar el hash Argon2
+    if hashlib.sha256(password.lower().encode('utf-8')).hexdigest() in _WEAK_PASSWORD_HASHES:
+        return False, "La contrasena es demasiado comun"
     return True, None
 
 
@@ -45,46 +162,73 @@ def validate_password(password: str) -> tuple:
 @role_required('admin')
 def list_users():
     """
-    Listar todos los usuarios
+    Listar usuarios (paginado)
     ---
     tags:
       - Usuarios
     security:
       - Bearer: []
+    parameters:
+      - name: page
+        in: query
+        type: integer
+        required: false
+        description: Pagina (default 1)
+      - name: per_page
+        in: query
+        type: integer
+        required: false
+        description: Usuarios por pagina (default 50, maximo 100)
     responses:
       200:
         description: Lista de usuarios
+      400:
+        description: Parametros de paginacion invalidos
       401:
         description: No autorizado
       403:
         description: Sin permisos
     """
-    if request.method == 'OPTIONS':
-        return '', 204
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(MAX_USERS_PER_PAGE, max(1, int(request.args.get('per_page', DEFAULT_USERS_PER_PAGE))))
+    except ValueError:
+        return ojsonify({
+            'success': False,
+            'message': 'Parametros de paginacion invalidos'
+        }, 400)
 
     try:
-        users = User.query.all()
-        users_data = [{
-            'id': u.id,
-            'email': u.email,
-            'name': u.name,
-            'role': u.role,
-            'is_active': u.is_active,
-            'created_at': u.created_at.isoformat() if u.created_at else None
-        } for u in users]
-
-        return jsonify({
+        total = db.session.scalar(select(func.count()).select_from(User))
+
+        # Solo las columnas que se devuelven (sin password_hash ni hidratar el ORM)
+        rows = db.session.execute(
+            select(*_USER_COLUMNS)
+            .order_by(User.id)
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        ).all()
+        users_data = [_user_to_dict(row) for row in rows]
+
+        return ojsonify({
             'success': True,
             'users': users_data,
-            'total': len(users_data)
-        }), 200
-
-    except Exception as e:
-        logger.error(f"Error listando usuarios: {str(e)}")
-        return jsonify({
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': math.ceil(total / per_page)
+        }, 200), {
+            'X-Total-Count': str(total),
+            'X-Page': str(page),
+            'X-Per-Page': str(per_page)
+        }
+
+    except Exception:
+        logger.exception("Error listando usuarios")
+        return ojsonify({
             'success': False,
             'message': 'Error al obtener usuarios'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users/<int:user_id>', methods=['GET', 'OPTIONS'])
@@ -109,35 +253,25 @@ def get_user(user_id):
       404:
         description: Usuario no encontrado
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        user = User.query.get(user_id)
+        user = _get_user_dict(user_id)
         if not user:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Usuario no encontrado'
-            }), 404
+            }, 404)
 
-        return jsonify({
+        return ojsonify({
             'success': True,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'name': user.name,
-                'role': user.role,
-                'is_active': user.is_active,
-                'created_at': user.created_at.isoformat() if user.created_at else None
-            }
-        }), 200
+            'user': user
+        }, 200)
 
-    except Exception as e:
-        logger.error(f"Error obteniendo usuario {user_id}: {str(e)}")
-        return jsonify({
+    except Exception:
+        logger.exception("Error obteniendo usuario %s", user_id)
+        return ojsonify({
             'success': False,
             'message': 'Error al obtener usuario'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users', methods=['POST', 'OPTIONS'])
@@ -180,26 +314,22 @@ def create_user():
       409:
         description: Email ya existe
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
 
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No se recibieron datos'
-            }), 400
+            }, 400)
 
         # Validar campos requeridos
-        required_fields = ['email', 'password', 'name', 'role']
-        for field in required_fields:
+        for field in _REQUIRED_CREATE_FIELDS:
             if not data.get(field):
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': f'El campo {field} es requerido'
-                }), 400
+                }, 400)
 
         email = data['email'].strip().lower()
         password = data['password']
@@ -208,39 +338,28 @@ def create_user():
 
         # Validar email
         if not validate_email(email):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Formato de email invalido'
-            }), 400
+            }, 400)
 
         # Validar password
         is_valid, error_msg = validate_password(password)
         if not is_valid:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': error_msg
-            }), 400
+            }, 400)
 
         # Validar rol
-        if role not in ['admin', 'sales']:
-            return jsonify({
+        if role not in _VALID_ROLES:
+            return ojsonify({
                 'success': False,
                 'message': 'Rol invalido. Debe ser admin o sales'
-            }), 400
-
-        # Verificar si el email ya existe
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
-            return jsonify({
-                'success': False,
-                'message': 'El email ya esta registrado'
-            }), 409
+            }, 400)
 
         # Hashear la contrasena
-        password_hash = bcrypt.hashpw(
-            password.encode('utf-8'),
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        password_hash = PasswordService.hash_password(password)
 
         # Crear usuario
         new_user = User(
@@ -251,16 +370,24 @@ def create_user():
             is_active=True
         )
 
+        # El indice unico de email detecta duplicados (sin SELECT previo ni carrera)
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return ojsonify({
+                'success': False,
+                'message': 'El email ya esta registrado'
+            }, 409)
 
         current_user = get_current_user()
         logger.info(
-            f"Usuario creado: {email} por {current_user.get('email')} "
-            f"- IP: {request.remote_addr}"
+            "Usuario creado: %s por %s - IP: %s",
+            email, current_user.get('email'), request.remote_addr
         )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Usuario creado exitosamente',
             'user': {
@@ -270,15 +397,15 @@ def create_user():
                 'role': new_user.role,
                 'is_active': new_user.is_active
             }
-        }), 201
+        }, 201)
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        logger.error(f"Error creando usuario: {str(e)}")
-        return jsonify({
+        logger.exception("Error creando usuario")
+        return ojsonify({
             'success': False,
             'message': 'Error al crear usuario'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users/<int:user_id>', methods=['PUT', 'OPTIONS'])
@@ -316,43 +443,29 @@ def update_user(user_id):
       404:
         description: Usuario no encontrado
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Usuario no encontrado'
-            }), 404
+            }, 404)
 
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No se recibieron datos'
-            }), 400
+            }, 400)
 
         # Actualizar campos si estan presentes
         if 'email' in data and data['email']:
             new_email = data['email'].strip().lower()
             if not validate_email(new_email):
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Formato de email invalido'
-                }), 400
-
-            # Verificar que el email no este en uso por otro usuario
-            existing = User.query.filter(
-                User.email == new_email,
-                User.id != user_id
-            ).first()
-            if existing:
-                return jsonify({
-                    'success': False,
-                    'message': 'El email ya esta en uso'
-                }), 409
+                }, 400)
             user.email = new_email
 
         if 'name' in data and data['name']:
@@ -360,25 +473,34 @@ def update_user(user_id):
 
         if 'role' in data and data['role']:
             role = data['role'].strip().lower()
-            if role not in ['admin', 'sales']:
-                return jsonify({
+            if role not in _VALID_ROLES:
+                return ojsonify({
                     'success': False,
                     'message': 'Rol invalido'
-                }), 400
+                }, 400)
             user.role = role
 
         if 'is_active' in data:
             user.is_active = bool(data['is_active'])
 
-        db.session.commit()
+        # Un email en uso por otro usuario viola el indice unico
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return ojsonify({
+                'success': False,
+                'message': 'El email ya esta en uso'
+            }, 409)
+        _invalidate_user(user_id)
 
         current_user = get_current_user()
         logger.info(
-            f"Usuario actualizado: {user.email} por {current_user.get('email')} "
-            f"- IP: {request.remote_addr}"
+            "Usuario actualizado: %s por %s - IP: %s",
+            user.email, current_user.get('email'), request.remote_addr
         )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Usuario actualizado exitosamente',
             'user': {
@@ -388,15 +510,15 @@ def update_user(user_id):
                 'role': user.role,
                 'is_active': user.is_active
             }
-        }), 200
+        }, 200)
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        logger.error(f"Error actualizando usuario {user_id}: {str(e)}")
-        return jsonify({
+        logger.exception("Error actualizando usuario %s", user_id)
+        return ojsonify({
             'success': False,
             'message': 'Error al actualizar usuario'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users/<int:user_id>', methods=['DELETE', 'OPTIONS'])
@@ -421,46 +543,46 @@ def delete_user(user_id):
       404:
         description: Usuario no encontrado
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({
-                'success': False,
-                'message': 'Usuario no encontrado'
-            }), 404
-
-        # No permitir auto-desactivacion
+        # No permitir auto-desactivacion (se sabe sin consultar la base de datos)
         current_user = get_current_user()
-        if user.id == current_user.get('userId'):
-            return jsonify({
+        if user_id == current_user.get('userId'):
+            return ojsonify({
                 'success': False,
                 'message': 'No puede desactivar su propia cuenta'
-            }), 400
+            }, 400)
+
+        # Soft delete - solo desactivar, en un solo UPDATE ... RETURNING
+        row = db.session.execute(
+            update(User).where(User.id == user_id).values(is_active=False).returning(User.email)
+        ).first()
+        if row is None:
+            db.session.rollback()
+            return ojsonify({
+                'success': False,
+                'message': 'Usuario no encontrado'
+            }, 404)
 
-        # Soft delete - solo desactivar
-        user.is_active = False
         db.session.commit()
+        _invalidate_user(user_id)
 
         logger.info(
-            f"Usuario desactivado: {user.email} por {current_user.get('email')} "
-            f"- IP: {request.remote_addr}"
+            "Usuario desactivado: %s por %s - IP: %s",
+            row.email, current_user.get('email'), request.remote_addr
         )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Usuario desactivado exitosamente'
-        }), 200
+        }, 200)
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        logger.error(f"Error desactivando usuario {user_id}: {str(e)}")
-        return jsonify({
+        logger.exception("Error desactivando usuario %s", user_id)
+        return ojsonify({
             'success': False,
             'message': 'Error al desactivar usuario'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users/change-password', methods=['POST', 'OPTIONS'])
@@ -493,77 +615,66 @@ def change_own_password():
       400:
         description: Contrasena actual incorrecta o nueva contrasena invalida
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No se recibieron datos'
-            }), 400
+            }, 400)
 
         current_password = data.get('current_password')
         new_password = data.get('new_password')
 
         if not current_password or not new_password:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Contrasena actual y nueva son requeridas'
-            }), 400
+            }, 400)
 
         # Validar nueva contrasena
         is_valid, error_msg = validate_password(new_password)
         if not is_valid:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': error_msg
-            }), 400
+            }, 400)
 
         current_user = get_current_user()
-        user = User.query.get(current_user.get('userId'))
+        user = db.session.get(User, current_user.get('userId'))
 
         if not user:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Usuario no encontrado'
-            }), 404
+            }, 404)
 
         # Verificar contrasena actual
-        if not bcrypt.checkpw(
-            current_password.encode('utf-8'),
-            user.password_hash.encode('utf-8')
-        ):
-            return jsonify({
+        if not PasswordService.verify_password(current_password, user.password_hash):
+            return ojsonify({
                 'success': False,
                 'message': 'Contrasena actual incorrecta'
-            }), 400
+            }, 400)
 
         # Actualizar contrasena
-        user.password_hash = bcrypt.hashpw(
-            new_password.encode('utf-8'),
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        user.password_hash = PasswordService.hash_password(new_password)
 
         db.session.commit()
 
-        logger.info(
-            f"Contrasena cambiada: {user.email} - IP: {request.remote_addr}"
-        )
+        logger.info("Contrasena cambiada: %s - IP: %s", user.email, request.remote_addr)
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Contrasena actualizada exitosamente'
-        }), 200
+        }, 200)
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        logger.error(f"Error cambiando contrasena: {str(e)}")
-        return jsonify({
+        logger.exception("Error cambiando contrasena")
+        return ojsonify({
             'success': False,
             'message': 'Error al cambiar contrasena'
-        }), 500
+        }, 500)
 
 
 @bp.route('/api/users/<int:user_id>/reset-password', methods=['POST', 'OPTIONS'])
@@ -598,61 +709,61 @@ def reset_password(user_id):
       404:
         description: Usuario no encontrado
     """
-    if request.method == 'OPTIONS':
-        return '', 204
-
     try:
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({
-                'success': False,
-                'message': 'Usuario no encontrado'
-            }), 404
-
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
         if not data or not data.get('new_password'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Nueva contrasena es requerida'
-            }), 400
+            }, 400)
 
         new_password = data['new_password']
 
         # Validar nueva contrasena
         is_valid, error_msg = validate_password(new_password)
         if not is_valid:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': error_msg
-            }), 400
-
-        # Actualizar contrasena
-        user.password_hash = bcrypt.hashpw(
-            new_password.encode('utf-8'),
-            bcrypt.gensalt()
-        ).decode('utf-8')
-
-        # Resetear intentos fallidos y desbloquear
-        user.failed_login_attempts = 0
-        user.locked_until = None
+            }, 400)
+
+        # Actualizar contrasena, resetear intentos fallidos y desbloquear
+        # en un solo UPDATE (sin cargar antes el usuario)
+        row = db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                password_hash=PasswordService.hash_password(new_password),
+                failed_login_attempts=0,
+                locked_until=None
+            )
+            .returning(User.email)
+        ).first()
+        if row is None:
+            db.session.rollback()
+            return ojsonify({
+                'success': False,
+                'message': 'Usuario no encontrado'
+            }, 404)
 
         db.session.commit()
+        _invalidate_user(user_id)
 
         current_user = get_current_user()
         logger.info(
-            f"Contrasena reseteada para {user.email} por {current_user.get('email')} "
-            f"- IP: {request.remote_addr}"
+            "Contrasena reseteada para %s por %s - IP: %s",
+            row.email, current_user.get('email'), request.remote_addr
         )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Contrasena reseteada exitosamente'
-        }), 200
+        }, 200)
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        logger.error(f"Error reseteando contrasena para usuario {user_id}: {str(e)}")
-        return jsonify({
+        logger.exception("Error reseteando contrasena para usuario %s", user_id)
+        return ojsonify({
             'success': False,
             'message': 'Error al resetear contrasena'
-        }), 500
+        }, 500)
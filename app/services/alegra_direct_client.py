@@ -2,13 +2,73 @@
 Cliente para APIs directas de Alegra (no documentadas)
 Estas APIs se descubrieron mediante inspección de red en la plataforma
 """
+import atexit
+import threading
+import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from cachetools import LRUCache, TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 
+from app.exceptions import AlegraCircuitOpenError
+
 logger = logging.getLogger(__name__)
 
+# Máximo de páginas pedidas a Alegra en paralelo (respeta su límite de peticiones)
+MAX_CONCURRENT_PAGES = 8
+
+# Pool compartido para descargar páginas en paralelo
+_page_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES, thread_name_prefix='alegra-pages')
+
+# Días de facturas descargados en paralelo. Es un pool aparte: cada día usa a su
+# vez _page_executor, y compartir el pool podría dejar a los días esperando páginas
+# que nunca obtienen hilo (deadlock)
+MAX_CONCURRENT_DAYS = 4
+_day_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DAYS, thread_name_prefix='alegra-days')
+
+# Circuit breaker: tras CIRCUIT_FAILURE_THRESHOLD fallos seguidos de Alegra (caída,
+# timeout, 429/5xx) las peticiones fallan de inmediato durante CIRCUIT_COOLDOWN
+# segundos; pasado ese tiempo la siguiente petición sirve de prueba (half-open)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 30
+
+# Tope de espera cuando Alegra envía Retry-After (backoff_max no lo limita)
+RETRY_AFTER_MAX = 10
+
+
+class _CappedRetry(Retry):
+    """Retry que nunca espera más de RETRY_AFTER_MAX segundos por un Retry-After"""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+
+# Reintentos ante errores transitorios (429 por límite de peticiones y 5xx):
+# espera exponencial 1s, 2s, 4s... (tope 30s) más jitter aleatorio para que los
+# hilos no reintenten todos a la vez. No se reintentan timeouts de lectura
+# (read=0): un GET colgado ya consumió el timeout completo y reintentarlo
+# superaría el timeout del worker de gunicorn
+ALEGRA_RETRY = _CappedRetry(
+    total=3,
+    read=0,
+    backoff_factor=1.0,
+    backoff_jitter=1.0,
+    backoff_max=30,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET']),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
 
 class AlegraDirectClient:
     """
@@ -16,7 +76,15 @@ class AlegraDirectClient:
     que proporcionan información más detallada y rápida
     """
 
-    def __init__(self, username: str, token: str, base_url: str = "https://app.alegra.com/api/v1", timeout: int = 30):
+    def __init__(
+        self,
+        username: str,
+        token: str,
+        base_url: str = "https://app.alegra.com/api/v1",
+        timeout: int = 30,
+        pool_maxsize: int = 50,
+        cache_ttl: int = 60
+    ):
         """
         Inicializa el cliente de APIs directas de Alegra
 
@@ -25,6 +93,8 @@ class AlegraDirectClient:
             token: Token de API de Alegra
             base_url: URL base de la API
             timeout: Timeout para las peticiones en segundos
+            pool_maxsize: Conexiones HTTP reutilizables hacia Alegra (debe cubrir la concurrencia esperada)
+            cache_ttl: Segundos que se reutiliza una respuesta cacheada (0 desactiva el cache)
         """
         self.username = username
         self.token = token
@@ -32,49 +102,186 @@ class AlegraDirectClient:
         self.timeout = timeout
         self.auth = (username, token)
 
+        # Sesion compartida: reutiliza conexiones TCP/TLS entre peticiones.
+        # Session es segura para uso concurrente desde varios hilos (urllib3 bloquea el pool)
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(username, token)
+        # Respuestas comprimidas (urllib3 las descomprime; 'br' requiere el paquete Brotli)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate, br'
+        })
+
+        # Un solo host (Alegra): un pool con pool_maxsize conexiones. Sin pool_block,
+        # si se excede el tamaño se abre una conexión extra en lugar de esperar
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+            max_retries=ALEGRA_RETRY
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Cache de respuestas (cache-aside) para consultas de solo lectura que se
+        # repiten con los mismos parámetros durante un cierre de caja
+        self._cache = TTLCache(maxsize=256, ttl=cache_ttl) if cache_ttl > 0 else None
+        self._cache_lock = threading.Lock()
+        # Validadores HTTP (ETag / Last-Modified) de las mismas consultas: sobreviven
+        # al TTL y permiten revalidar con un GET condicional (304 sin cuerpo)
+        self._validators = LRUCache(maxsize=256)
+
+        # Estado del circuit breaker
+        self._failure_count = 0
+        self._open_until = 0.0
+        self._breaker_lock = threading.Lock()
+
+        # La sesión vive todo el proceso; cerrar sus conexiones limpiamente al salir
+        atexit.register(self.close)
+
         logger.info(f"Cliente Alegra Direct API inicializado para usuario: {username}")
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def close(self) -> None:
+        """Cierra las conexiones HTTP de la sesión compartida"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """
+        Descarta respuestas cacheadas
+
+        Args:
+            endpoint: Solo las de este endpoint; None descarta todo el cache
+        """
+        with self._cache_lock:
+            for cache in (self._cache, self._validators):
+                if cache is None:
+                    continue
+                if endpoint is None:
+                    cache.clear()
+                else:
+                    for key in [k for k in cache.keys() if k[0] == endpoint]:
+                        cache.pop(key, None)
+
+    def _record_failure(self) -> None:
+        """Cuenta un fallo de Alegra y abre el circuito al llegar al umbral"""
+        with self._breaker_lock:
+            self._failure_count += 1
+            if self._failure_count >= CIRCUIT_FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + CIRCUIT_COOLDOWN
+                logger.warning(
+                    "Circuito de Alegra abierto por %s segundos tras %s fallos seguidos",
+                    CIRCUIT_COOLDOWN, self._failure_count
+                )
+
+    def _record_success(self) -> None:
+        """Cierra el circuito tras una respuesta correcta"""
+        if self._failure_count:
+            with self._breaker_lock:
+                self._failure_count = 0
+                self._open_until = 0.0
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None, use_cache: bool = False) -> Dict[str, Any]:
         """
         Realiza una petición HTTP a la API de Alegra
 
         Args:
             endpoint: Endpoint relativo (ej: '/reports/inventory-value')
             params: Parámetros de query
+            use_cache: Reutilizar/guardar la respuesta en el cache TTL del cliente y
+                revalidarla con ETag/Last-Modified cuando el TTL expira. Una respuesta
+                cacheada puede tener hasta ALEGRA_CACHE_TTL segundos; si quien llama
+                guarda el resultado en otro cache, debe pasar False para que las
+                antigüedades no se sumen
 
         Returns:
             Respuesta JSON decodificada
 
         Raises:
+            AlegraCircuitOpenError: Si el circuito está abierto (Alegra falló repetidamente)
             requests.exceptions.RequestException: Si hay error en la petición
         """
+        cache_key = None
+        validator = None
+        if use_cache:
+            cache_key = (endpoint, tuple(sorted((params or {}).items())))
+            with self._cache_lock:
+                cached = self._cache.get(cache_key) if self._cache is not None else None
+                validator = self._validators.get(cache_key)
+            if cached is not None:
+                logger.debug("Respuesta cacheada de API directa: %s", endpoint)
+                return cached
+
+        # Fallar rápido mientras Alegra está degradado
+        if time.monotonic() < self._open_until:
+            raise AlegraCircuitOpenError()
+
+        # GET condicional si ya tenemos una versión de esta consulta
+        headers = None
+        if validator is not None:
+            etag, last_modified, _ = validator
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
         url = f"{self.base_url}{endpoint}"
         
         try:
-            logger.debug(f"Petición a API directa: {url} con params: {params}")
+            logger.debug("Petición a API directa: %s con params: %s", url, params)
             
-            response = requests.get(
+            response = self.session.get(
                 url,
-                auth=self.auth,
                 params=params or {},
-                timeout=self.timeout,
-                headers={'Content-Type': 'application/json'}
+                headers=headers,
+                timeout=self.timeout
             )
             
-            response.raise_for_status()
-            data = response.json()
-            
-            logger.debug(f"Respuesta exitosa de API directa: {endpoint}")
+            if response.status_code == 304 and validator is not None:
+                # Sin cambios en Alegra: se reutiliza el cuerpo ya decodificado
+                data = validator[2]
+                logger.debug("Respuesta no modificada (304) de API directa: %s", endpoint)
+            else:
+                response.raise_for_status()
+                # orjson decodifica directamente los bytes (más rápido que response.json())
+                data = orjson.loads(response.content)
+                logger.debug(
+                    "Respuesta exitosa de API directa: %s (Content-Encoding: %s)",
+                    endpoint, response.headers.get('Content-Encoding')
+                )
+
+                if cache_key is not None:
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+                    if etag or last_modified:
+                        with self._cache_lock:
+                            self._validators[cache_key] = (etag, last_modified, data)
+
+            self._record_success()
+            if cache_key is not None and self._cache is not None:
+                with self._cache_lock:
+                    self._cache[cache_key] = data
             return data
             
         except requests.exceptions.Timeout:
             logger.error(f"Timeout en petición a {url}")
+            self._record_failure()
             raise
         except requests.exceptions.HTTPError as e:
             logger.error(f"Error HTTP {e.response.status_code} en {url}: {e.response.text}")
+            # Los 4xx son errores de la petición, no de disponibilidad de Alegra
+            if e.response.status_code == 429 or e.response.status_code >= 500:
+                self._record_failure()
             raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error en petición a {url}: {str(e)}")
+            self._record_failure()
             raise
         except ValueError as e:
             logger.error(f"Error decodificando JSON de {url}: {str(e)}")
@@ -85,16 +292,23 @@ class AlegraDirectClient:
         to_date: str,
         max_items: int = 3000,
         page_size: int = 200,
-        query: str = ""
+        query: str = "",
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Obtiene el reporte de inventario completo usando paginación automática
 
+        La primera página se pide sola (la mayoría de consultas caben en ella);
+        si viene llena, las siguientes se piden en tandas de MAX_CONCURRENT_PAGES
+        en paralelo hasta encontrar una página corta.
+
         Args:
             to_date: Fecha hasta la cual generar el reporte (YYYY-MM-DD)
             max_items: Máximo número total de items a obtener (default: 3000)
             page_size: Items por página (default: 200, para evitar error 503)
             query: Filtro de búsqueda opcional
+            use_cache: Reutilizar las páginas cacheadas (TTL del cliente).
+                Pasar False si el resultado se guarda en otro cache
 
         Returns:
             Dict con todos los items combinados y filtrados
@@ -103,54 +317,66 @@ class AlegraDirectClient:
         total_received = 0
         total_filtered_asterisk = 0
         total_filtered_disabled = 0
-        current_page = 1
+        pages_fetched = 0
+        max_pages = (max_items + page_size - 1) // page_size
 
         logger.info(f"Iniciando consulta paginada de inventario (max: {max_items}, page_size: {page_size})")
 
-        while total_received < max_items:
-            try:
-                # Calcular cuántos items faltan
-                remaining = max_items - total_received
-                current_limit = min(page_size, remaining)
-
-                logger.info(f"Obteniendo página {current_page} ({current_limit} items)...")
-
-                # Llamar al método original con paginación
-                page_result = self.get_inventory_value_report(
-                    to_date=to_date,
-                    limit=current_limit,
-                    page=current_page,
-                    query=query
-                )
+        def fetch_page(page: int) -> Dict[str, Any]:
+            offset = (page - 1) * page_size
+            return self.get_inventory_value_report(
+                to_date=to_date,
+                limit=min(page_size, max_items - offset),
+                page=page,
+                query=query,
+                start=offset,
+                use_cache=use_cache
+            )
 
+        next_page = 1
+        while next_page <= max_pages:
+            # Primera página sola; luego tandas en paralelo
+            wave_size = 1 if next_page == 1 else MAX_CONCURRENT_PAGES
+            wave = range(next_page, min(next_page + wave_size, max_pages + 1))
+            if len(wave) == 1:
+                results = [fetch_page(next_page)]
+            else:
+                logger.info("Obteniendo páginas %s-%s en paralelo...", wave.start, wave.stop - 1)
+                results = list(_page_executor.map(fetch_page, wave))
+
+            last_page_reached = False
+            for page, page_result in zip(wave, results):
                 if not page_result.get('success'):
-                    logger.error(f"Error en página {current_page}: {page_result.get('error')}")
+                    logger.error(f"Error en página {page}: {page_result.get('error')}")
+                    last_page_reached = True
                     break
 
                 page_data = page_result.get('data', [])
                 page_metadata = page_result.get('metadata', {})
+                page_received = page_metadata.get('total_received', 0)
 
                 # Acumular estadísticas
-                total_received += page_metadata.get('total_received', 0)
+                total_received += page_received
                 total_filtered_asterisk += page_metadata.get('total_filtered_asterisk', 0)
                 total_filtered_disabled += page_metadata.get('total_filtered_disabled', 0)
                 all_items.extend(page_data)
+                pages_fetched = page
 
                 logger.info(
-                    f"Página {current_page}: recibidos={page_metadata.get('total_received', 0)}, "
-                    f"válidos={len(page_data)}, total acumulado={len(all_items)}"
+                    "Página %s: recibidos=%s, válidos=%s, total acumulado=%s",
+                    page, page_received, len(page_data), len(all_items)
                 )
 
                 # Si recibimos menos items de los solicitados, ya no hay más páginas
-                if page_metadata.get('total_received', 0) < current_limit:
+                # (las páginas posteriores de la tanda se descartan)
+                if page_received < page_metadata.get('limit', page_size):
                     logger.info("Última página alcanzada")
+                    last_page_reached = True
                     break
 
-                current_page += 1
-
-            except Exception as e:
-                logger.error(f"Error obteniendo página {current_page}: {str(e)}")
+            if last_page_reached:
                 break
+            next_page = wave.stop
 
         logger.info(
             f"Paginación completa: {total_received} items recibidos, "
@@ -172,7 +398,7 @@ class AlegraDirectClient:
                 'total_filtered_disabled': total_filtered_disabled,
                 'total_filtered': total_filtered_asterisk + total_filtered_disabled,
                 'total_returned': len(all_items),
-                'pages_fetched': current_page
+                'pages_fetched': pages_fetched
             }
         }
 
@@ -181,7 +407,9 @@ class AlegraDirectClient:
         to_date: str,
         limit: int = 200,
         page: int = 1,
-        query: str = ""
+        query: str = "",
+        start: Optional[int] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Obtiene el reporte de valor de inventario filtrando items obsoletos y deshabilitados
@@ -195,6 +423,9 @@ class AlegraDirectClient:
             limit: Número de items por página (default: 3000 para traer todo el inventario)
             page: Número de página (1-indexed)
             query: Filtro de búsqueda opcional
+            start: Offset explícito (por defecto (page - 1) * limit)
+            use_cache: Reutilizar la respuesta cacheada si existe (TTL del cliente).
+                Pasar False si el resultado se guarda en otro cache
 
         Returns:
             Dict con estructura:
@@ -218,48 +449,47 @@ class AlegraDirectClient:
             'toDate': to_date,
             'page': page,
             'limit': limit,
-            'start': (page - 1) * limit,
+            'start': (page - 1) * limit if start is None else start,
             'query': query
         }
 
         try:
-            response = self._make_request('/reports/inventory-value', params)
+            response = self._make_request('/reports/inventory-value', params, use_cache=use_cache)
 
             # Extraer datos de la respuesta
             raw_data = response if isinstance(response, list) else response.get('data', [])
 
-            # FILTRAR items con asteriscos y deshabilitados
-            filtered_data = []
-            items_filtered_asterisk = 0
-            items_filtered_disabled = 0
-
-            for item in raw_data:
-                item_name = item.get('name', '') if isinstance(item, dict) else ''
-                item_status = item.get('status', 'active') if isinstance(item, dict) else 'active'
-
-                # Filtrar si el nombre comienza con asteriscos o es solo asteriscos
-                if item_name and item_name.strip().startswith('*'):
-                    items_filtered_asterisk += 1
-                    logger.debug(f"Item filtrado (asteriscos): {item_name}")
-                    continue
-
-                # Filtrar si el item está deshabilitado
-                if item_status != 'active':
-                    items_filtered_disabled += 1
-                    logger.debug(f"Item filtrado (deshabilitado): {item_name} (status: {item_status})")
-                    continue
-
-                # Si el item pasa ambos filtros, agregarlo
-                filtered_data.append(item)
+            # FILTRAR items con asteriscos (obsoletos) y luego los deshabilitados.
+            # Dos comprensiones en lugar de un bucle con logging por item; los
+            # conteos salen por diferencia de longitudes
+            not_obsolete = [
+                item for item in raw_data
+                if not isinstance(item, dict) or not (item.get('name') or '').lstrip().startswith('*')
+            ]
+            filtered_data = [
+                item for item in not_obsolete
+                if not isinstance(item, dict) or item.get('status', 'active') == 'active'
+            ]
+            items_filtered_asterisk = len(raw_data) - len(not_obsolete)
+            items_filtered_disabled = len(not_obsolete) - len(filtered_data)
 
             total_filtered = items_filtered_asterisk + items_filtered_disabled
 
+            # Un solo log por página; en DEBUG se agregan algunos nombres de muestra
             logger.info(
-                f"Inventario procesado: {len(raw_data)} items recibidos, "
-                f"{items_filtered_asterisk} filtrados (asteriscos), "
-                f"{items_filtered_disabled} filtrados (deshabilitados), "
-                f"{len(filtered_data)} enviados al frontend"
+                "Inventario procesado (página %s): %s items recibidos, %s filtrados (asteriscos), "
+                "%s filtrados (deshabilitados), %s enviados al frontend",
+                page, len(raw_data), items_filtered_asterisk, items_filtered_disabled, len(filtered_data)
             )
+            if total_filtered and logger.isEnabledFor(logging.DEBUG):
+                kept_ids = set(map(id, not_obsolete))
+                dropped_asterisk = [item.get('name') for item in raw_data if id(item) not in kept_ids][:5]
+                kept_ids = set(map(id, filtered_data))
+                dropped_disabled = [item.get('name') for item in not_obsolete if id(item) not in kept_ids][:5]
+                logger.debug(
+                    "Filtrados en página %s: asteriscos=%s, deshabilitados=%s",
+                    page, dropped_asterisk, dropped_disabled
+                )
 
             # Agregar metadata de paginación
             return {
@@ -291,7 +521,8 @@ class AlegraDirectClient:
         to_date: str,
         group_by: str = 'day',
         limit: int = 10,
-        start: int = 0
+        start: int = 0,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Obtiene totales de ventas agrupados por día o mes
@@ -302,6 +533,8 @@ class AlegraDirectClient:
             group_by: Agrupación ('day' o 'month')
             limit: Número de registros a retornar
             start: Offset para paginación
+            use_cache: Reutilizar la respuesta cacheada si existe (TTL del cliente).
+                Pasar False si el resultado se guarda en otro cache
 
         Returns:
             Dict con estructura:
@@ -327,7 +560,7 @@ class AlegraDirectClient:
         }
 
         try:
-            response = self._make_request('/invoices/sales-totals', params)
+            response = self._make_request('/invoices/sales-totals', params, use_cache=use_cache)
             
             return {
                 'success': True,
@@ -383,64 +616,18 @@ class AlegraDirectClient:
             start_date = datetime.strptime(from_date, '%Y-%m-%d')
             end_date = datetime.strptime(to_date, '%Y-%m-%d')
 
-            all_invoices = []
-            days_processed = 0
-            current_date = start_date
-
-            # Iterar día por día
-            while current_date <= end_date:
-                date_str = current_date.strftime('%Y-%m-%d')
-                logger.info(f"Obteniendo facturas para la fecha: {date_str}")
-
-                # Para cada día, obtener todas las facturas con paginación
-                start = 0
-                limit = 30
-                day_invoices = []
-
-                while True:
-                    params = {
-                        'date': date_str,
-                        'limit': limit,
-                        'start': start
-                    }
-
-                    try:
-                        # Llamar al endpoint /invoices con parámetro date para obtener facturas completas
-                        response = self._make_request('/invoices', params)
-
-                        # La respuesta puede ser una lista directamente o un objeto con data
-                        invoices_batch = response if isinstance(response, list) else response.get('data', [])
-
-                        # Log de debugging para ver si las facturas tienen items
-                        if invoices_batch and len(invoices_batch) > 0:
-                            first_invoice = invoices_batch[0]
-                            logger.info(f"Primera factura de {date_str}: ID={first_invoice.get('id')}, tiene items={bool(first_invoice.get('items'))}, items count={len(first_invoice.get('items', []))}")
-                            logger.debug(f"Estructura de primera factura: {list(first_invoice.keys())}")
-
-                        if not invoices_batch or len(invoices_batch) == 0:
-                            # No hay más facturas para este día
-                            break
+            dates = [
+                (start_date + timedelta(days=i)).strftime('%Y-%m-%d')
+                for i in range((end_date - start_date).days + 1)
+            ]
 
-                        day_invoices.extend(invoices_batch)
-
-                        # Si recibimos menos de 'limit' facturas, es la última página
-                        if len(invoices_batch) < limit:
-                            break
-
-                        # Incrementar el offset para la siguiente página
-                        start += limit
-
-                    except Exception as e:
-                        logger.error(f"Error obteniendo facturas para {date_str} (start={start}): {str(e)}")
-                        # Continuar con el siguiente día si hay un error
-                        break
-
-                logger.info(f"Obtenidas {len(day_invoices)} facturas para {date_str}")
+            # Los días son independientes: se descargan en paralelo y se
+            # concatenan en orden de fecha (map conserva el orden)
+            all_invoices = []
+            for date_str, day_invoices in zip(dates, _day_executor.map(self._get_invoices_for_day_safe, dates)):
+                logger.info("Obtenidas %s facturas para %s", len(day_invoices), date_str)
                 all_invoices.extend(day_invoices)
-                days_processed += 1
-
-                # Avanzar al siguiente día
-                current_date += timedelta(days=1)
+            days_processed = len(dates)
 
             logger.info(f"Total de facturas obtenidas: {len(all_invoices)} en {days_processed} días")
 
@@ -455,6 +642,13 @@ class AlegraDirectClient:
                 }
             }
 
+        except AlegraCircuitOpenError as e:
+            logger.warning(f"Consulta de facturas {from_date} - {to_date} abortada: {e.message}")
+            return {
+                'success': False,
+                'error': e.message,
+                'data': []
+            }
         except Exception as e:
             logger.error(f"Error en get_all_invoices_for_date_range: {str(e)}")
             return {
@@ -463,6 +657,84 @@ class AlegraDirectClient:
                 'data': []
             }
 
+    def _get_invoices_for_day_safe(self, date_str: str) -> List[Dict[str, Any]]:
+        """Como _get_invoices_for_day, pero un error en un día no afecta a los demás"""
+        try:
+            return self._get_invoices_for_day(date_str)
+        except AlegraCircuitOpenError:
+            # Circuito abierto: se aborta todo el rango, no solo este día
+            raise
+        except Exception as e:
+            logger.error(f"Error obteniendo facturas para {date_str}: {str(e)}")
+            return []
+
+    def _get_invoices_for_day(self, date_str: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        Obtiene todas las facturas de un día
+
+        La primera petición se hace con metadata=true para conocer el total de
+        facturas del día; las páginas restantes se piden en paralelo. Si Alegra
+        no retorna metadata, se pagina secuencialmente hasta recibir una página corta.
+
+        Args:
+            date_str: Fecha (YYYY-MM-DD)
+            limit: Facturas por página (máximo de Alegra: 30)
+
+        Returns:
+            Lista de facturas del día, en el orden de Alegra
+        """
+        try:
+            # Llamar al endpoint /invoices con parámetro date para obtener facturas completas
+            response = self._make_request('/invoices', {
+                'date': date_str,
+                'limit': limit,
+                'start': 0,
+                'metadata': 'true'
+            })
+        except AlegraCircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Error obteniendo facturas para {date_str} (start=0): {str(e)}")
+            return []
+
+        # La respuesta puede ser una lista directamente o un objeto con data
+        first_batch = response if isinstance(response, list) else response.get('data', [])
+
+        # Si recibimos menos de 'limit' facturas, no hay más páginas
+        if len(first_batch) < limit:
+            return list(first_batch)
+
+        def fetch_page(start: int) -> List[Dict[str, Any]]:
+            try:
+                page = self._make_request('/invoices', {'date': date_str, 'limit': limit, 'start': start})
+                return page if isinstance(page, list) else page.get('data', [])
+            except AlegraCircuitOpenError:
+                raise
+            except Exception as e:
+                logger.error(f"Error obteniendo facturas para {date_str} (start={start}): {str(e)}")
+                return []
+
+        day_invoices = list(first_batch)
+        total = response.get('metadata', {}).get('total') if isinstance(response, dict) else None
+
+        if total:
+            # Conocemos el total: pedir todas las páginas restantes en paralelo
+            offsets = range(limit, int(total), limit)
+            for batch in _page_executor.map(fetch_page, offsets):
+                day_invoices.extend(batch)
+            return day_invoices
+
+        # Sin metadata: paginar secuencialmente hasta una página corta o vacía
+        start = limit
+        while True:
+            batch = fetch_page(start)
+            day_invoices.extend(batch)
+            if len(batch) < limit:
+                break
+            start += limit
+
+        return day_invoices
+
     def get_sales_documents(
         self,
         from_date: str,
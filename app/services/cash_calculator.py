@@ -2,7 +2,12 @@
 Servicio de cálculos de cierre de caja
 """
 from typing import Dict, Tuple
+import copy
 import logging
+import threading
+from operator import mul
+
+from cachetools import LRUCache
 
 from app.config import Config
 from app.services.knapsack_solver import construir_base_exacta
@@ -10,6 +15,12 @@ from app.utils.formatters import format_cop
 
 logger = logging.getLogger(__name__)
 
+# Resultados de calcular_base_y_consignacion por conteo (compartido entre
+# instancias: se crea un CashCalculator por petición). El operador suele
+# recalcular con el mismo conteo mientras ajusta excedentes y gastos
+_base_cache = LRUCache(maxsize=256)
+_base_cache_lock = threading.Lock()
+
 
 class CashCalculator:
     """Calculador de cierres de caja"""
@@ -34,12 +45,21 @@ class CashCalculator:
         self.umbral_menudo = umbral_menudo or Config.UMBRAL_MENUDO
         self.denominaciones_monedas = denominaciones_monedas or Config.DENOMINACIONES_MONEDAS
         self.denominaciones_billetes = denominaciones_billetes or Config.DENOMINACIONES_BILLETES
+        # Denominaciones inmutables: se reutilizan en cada cálculo y en la llave del cache
+        self._monedas = tuple(self.denominaciones_monedas)
+        self._billetes = tuple(self.denominaciones_billetes)
 
         logger.debug(
             f"CashCalculator inicializado: base={format_cop(self.base_objetivo)}, "
             f"umbral_menudo={format_cop(self.umbral_menudo)}"
         )
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Descarta los resultados de base y consignación memorizados"""
+        with _base_cache_lock:
+            _base_cache.clear()
+
     def calcular_totales(
         self,
         conteo_monedas: Dict[int, int],
@@ -55,8 +75,8 @@ class CashCalculator:
         Returns:
             Tuple (total_monedas, total_billetes, total_general)
         """
-        total_monedas = sum(denom * cant for denom, cant in conteo_monedas.items())
-        total_billetes = sum(denom * cant for denom, cant in conteo_billetes.items())
+        total_monedas = sum(map(mul, conteo_monedas, conteo_monedas.values()))
+        total_billetes = sum(map(mul, conteo_billetes, conteo_billetes.values()))
         total_general = total_monedas + total_billetes
 
         logger.info(
@@ -82,11 +102,26 @@ class CashCalculator:
         Returns:
             Dict con toda la información de base y consignación
         """
+        cache_key = (
+            tuple(sorted(conteo_monedas.items())),
+            tuple(sorted(conteo_billetes.items())),
+            self.base_objetivo,
+            self.umbral_menudo,
+            self._monedas,
+            self._billetes
+        )
+        with _base_cache_lock:
+            cached = _base_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Base y consignación tomadas del cache: {cached['mensaje_base']}")
+            # Copia: quien llama puede modificar el resultado
+            return copy.deepcopy(cached)
+
         # Combinar todas las denominaciones
         todas_denoms = {**conteo_monedas, **conteo_billetes}
 
         # Calcular total general PRIMERO para validación
-        total_general_disponible = sum(denom * cant for denom, cant in todas_denoms.items())
+        total_general_disponible = sum(map(mul, todas_denoms, todas_denoms.values()))
 
         # Resolver knapsack
         conteo_base, conteo_consignar, restante_base, exacto = construir_base_exacta(
@@ -95,25 +130,28 @@ class CashCalculator:
             self.umbral_menudo
         )
 
-        # Separar base en monedas y billetes
-        base_monedas = {d: conteo_base.get(d, 0) for d in self.denominaciones_monedas}
-        base_billetes = {d: conteo_base.get(d, 0) for d in self.denominaciones_billetes}
-
-        # Separar consignación en monedas y billetes
-        consignar_monedas = {d: conteo_consignar.get(d, 0) for d in self.denominaciones_monedas}
-        consignar_billetes = {d: conteo_consignar.get(d, 0) for d in self.denominaciones_billetes}
+        # Conteos como vectores paralelos a las denominaciones (orden de Config);
+        # los totales son productos punto con sum(map(mul, ...))
+        monedas = self._monedas
+        billetes = self._billetes
+        base_m = [conteo_base.get(d, 0) for d in monedas]
+        base_b = [conteo_base.get(d, 0) for d in billetes]
+        consignar_m = [conteo_consignar.get(d, 0) for d in monedas]
+        consignar_b = [conteo_consignar.get(d, 0) for d in billetes]
+
+        # Separar base y consignación en monedas y billetes
+        base_monedas = dict(zip(monedas, base_m))
+        base_billetes = dict(zip(billetes, base_b))
+        consignar_monedas = dict(zip(monedas, consignar_m))
+        consignar_billetes = dict(zip(billetes, consignar_b))
 
         # Calcular totales de base
-        total_base_monedas = sum(d * c for d, c in base_monedas.items())
-        total_base_billetes = sum(d * c for d, c in base_billetes.items())
+        total_base_monedas = sum(map(mul, monedas, base_m))
+        total_base_billetes = sum(map(mul, billetes, base_b))
         total_base = total_base_monedas + total_base_billetes
 
         # Calcular totales de consignación
-        total_consignar_sin_ajustes = sum(
-            d * c for d, c in consignar_monedas.items()
-        ) + sum(
-            d * c for d, c in consignar_billetes.items()
-        )
+        total_consignar_sin_ajustes = sum(map(mul, monedas, consignar_m)) + sum(map(mul, billetes, consignar_b))
 
         # NUEVA VALIDACIÓN: Determinar el estado de la base
         if total_general_disponible == self.base_objetivo:
@@ -164,6 +202,11 @@ class CashCalculator:
             f"({'exacta' if exacto else f'aproximada, restante knapsack: {format_cop(restante_base)}'})"
         )
 
+        # Solo se memorizan soluciones exactas
+        if exacto:
+            with _base_cache_lock:
+                _base_cache[cache_key] = copy.deepcopy(resultado)
+
         return resultado
 
     def aplicar_ajustes(
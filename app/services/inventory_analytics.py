@@ -2,7 +2,11 @@
 Servicio de análisis de inventario
 Procesa items de Alegra y genera métricas completas de inventario
 """
+import heapq
 import logging
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from operator import itemgetter, neg
 from typing import Dict, List
 from collections import defaultdict
 
@@ -23,6 +27,166 @@ class InventoryAnalytics:
         """
         self.items = items
         self.sku_parser = SKUParser()
+        # Agregados de todas las métricas (se calculan una vez, en _compute)
+        self._agg = None
+        # Nombres ya parseados: las variantes repiten nombre con frecuencia
+        self._parse_cache: Dict[str, Dict] = {}
+
+    def _parse(self, name: str) -> Dict:
+        """Parsea el nombre del producto una sola vez por nombre distinto"""
+        parsed = self._parse_cache.get(name)
+        if parsed is None:
+            parsed = self.sku_parser.extract_size_from_product_name(name)
+            self._parse_cache[name] = parsed
+        return parsed
+
+    def _compute(self) -> Dict:
+        """
+        Recorre los items una sola vez y acumula los datos de todas las métricas
+
+        Solo se consideran variantes con inventario. Cada método público
+        formatea su resultado a partir de estos agregados.
+
+        Returns:
+            Dict con los agregados (cacheado en self._agg)
+        """
+        if self._agg is not None:
+            return self._agg
+
+        summary = {
+            'total_items': 0,
+            'total_items_con_stock': 0,
+            'total_unidades': 0,
+            'valor_total_inventario': 0,
+            'valor_potencial_venta': 0
+        }
+        departments = defaultdict(lambda: {
+            'total_items': 0,
+            'total_unidades': 0,
+            'valor_inventario': 0,
+            'valor_potencial_venta': 0,
+            'margen': 0,
+            'por_categoria': defaultdict(lambda: {
+                'total_items': 0,
+                'total_unidades': 0,
+                'valor_inventario': 0
+            })
+        })
+        categories = defaultdict(lambda: {
+            'total_items': 0,
+            'total_unidades': 0,
+            'valor_inventario': 0
+        })
+        sizes = defaultdict(lambda: {
+            'total_unidades': 0,
+            'valor_inventario': 0,
+            'cantidad_items': 0
+        })
+        total_valor = 0
+        out_of_stock = []
+        # Productos con cantidad distinta de cero (bajo stock y top por valor)
+        stocked = []
+        # Valores distintos de cero para el análisis ABC
+        abc_valores = []
+        abc_total = 0
+
+        for item in self.items:
+            if item.get('type') != 'variant':
+                continue
+
+            inventory = item.get('inventory', {})
+            if not inventory:
+                continue
+
+            quantity = inventory.get('availableQuantity', 0)
+            unit_cost = inventory.get('unitCost', 0)
+
+            prices = item.get('price', [])
+            sale_price = prices[0].get('price', 0) if prices else 0
+
+            item_category = item.get('itemCategory', {})
+            category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
+
+            # Parsear nombre para obtener género y talla
+            name = item.get('name', '')
+            parsed = self._parse(name)
+            gender = parsed.get('gender', 'UNKNOWN')
+
+            valor_inv = quantity * unit_cost
+            valor_venta = quantity * sale_price
+
+            # Resumen ejecutivo
+            summary['total_items'] += 1
+            if quantity > 0:
+                summary['total_items_con_stock'] += 1
+                summary['total_unidades'] += quantity
+                summary['valor_total_inventario'] += valor_inv
+                summary['valor_potencial_venta'] += valor_venta
+
+            # Por departamento (y categoría dentro del departamento)
+            dept = departments[gender]
+            dept['total_items'] += 1
+            if quantity > 0:
+                dept['total_unidades'] += quantity
+                dept['valor_inventario'] += valor_inv
+                dept['valor_potencial_venta'] += valor_venta
+                dept['margen'] += valor_venta - valor_inv
+
+                cat = dept['por_categoria'][category_name]
+                cat['total_items'] += 1
+                cat['total_unidades'] += quantity
+                cat['valor_inventario'] += valor_inv
+
+            # Por categoría
+            total_valor += valor_inv
+            cat = categories[category_name]
+            cat['total_items'] += 1
+            cat['total_unidades'] += quantity
+            cat['valor_inventario'] += valor_inv
+
+            # Por talla
+            sz = sizes[parsed.get('size', 'UNKNOWN')]
+            sz['total_unidades'] += quantity
+            sz['valor_inventario'] += valor_inv
+            sz['cantidad_items'] += 1
+
+            if quantity == 0:
+                out_of_stock.append({
+                    'id': item.get('id', ''),
+                    'nombre': name,
+                    'categoria': category_name,
+                    'departamento': gender,
+                    'precio_venta': sale_price
+                })
+            else:
+                stocked.append({
+                    'id': item.get('id', ''),
+                    'nombre': name,
+                    'categoria': category_name,
+                    'departamento': gender,
+                    'cantidad': quantity,
+                    'costo_unitario': unit_cost,
+                    'precio_venta': sale_price,
+                    'valor_inventario': int(valor_inv),
+                    'valor_potencial_venta': int(valor_venta)
+                })
+
+            if valor_inv != 0:
+                abc_valores.append(valor_inv)
+                abc_total += valor_inv
+
+        self._agg = {
+            'summary': summary,
+            'departments': departments,
+            'categories': categories,
+            'total_valor': total_valor,
+            'sizes': sizes,
+            'out_of_stock': out_of_stock,
+            'stocked': stocked,
+            'abc_valores': abc_valores,
+            'abc_total': abc_total
+        }
+        return self._agg
 
     def get_complete_analysis(self) -> Dict:
         """
@@ -43,6 +207,9 @@ class InventoryAnalytics:
         """
         logger.info(f"Iniciando análisis completo de {len(self.items)} items")
 
+        # Una sola pasada sobre los items para todas las secciones
+        self._compute()
+
         return {
             'resumen_ejecutivo': self.get_executive_summary(),
             'por_departamento': self.get_by_department(),
@@ -71,34 +238,10 @@ class InventoryAnalytics:
                 'precio_promedio_venta': float
             }
         """
-        total_items = 0
-        total_items_con_stock = 0
-        total_unidades = 0
-        valor_total_inventario = 0
-        valor_potencial_venta = 0
-
-        for item in self.items:
-            # Solo procesar variantes (productos con inventario)
-            if item.get('type') != 'variant':
-                continue
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
-
-            # Precio de venta
-            prices = item.get('price', [])
-            sale_price = prices[0].get('price', 0) if prices else 0
-
-            total_items += 1
-            if quantity > 0:
-                total_items_con_stock += 1
-                total_unidades += quantity
-                valor_total_inventario += quantity * unit_cost
-                valor_potencial_venta += quantity * sale_price
+        agg = self._compute()['summary']
+        total_unidades = agg['total_unidades']
+        valor_total_inventario = agg['valor_total_inventario']
+        valor_potencial_venta = agg['valor_potencial_venta']
 
         margen_esperado = valor_potencial_venta - valor_total_inventario
         porcentaje_margen = (margen_esperado / valor_potencial_venta * 100) if valor_potencial_venta > 0 else 0
@@ -106,8 +249,8 @@ class InventoryAnalytics:
         precio_promedio = valor_potencial_venta / total_unidades if total_unidades > 0 else 0
 
         return {
-            'total_items': total_items,
-            'total_items_con_stock': total_items_con_stock,
+            'total_items': agg['total_items'],
+            'total_items_con_stock': agg['total_items_con_stock'],
             'total_unidades': total_unidades,
             'valor_total_inventario': int(valor_total_inventario),
             'valor_potencial_venta': int(valor_potencial_venta),
@@ -134,60 +277,7 @@ class InventoryAnalytics:
                 ...
             }
         """
-        departments = defaultdict(lambda: {
-            'total_items': 0,
-            'total_unidades': 0,
-            'valor_inventario': 0,
-            'valor_potencial_venta': 0,
-            'margen': 0,
-            'por_categoria': defaultdict(lambda: {
-                'total_items': 0,
-                'total_unidades': 0,
-                'valor_inventario': 0
-            })
-        })
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            # Parsear nombre para obtener género
-            name = item.get('name', '')
-            parsed = self.sku_parser.extract_size_from_product_name(name)
-            gender = parsed.get('gender', 'UNKNOWN')
-
-            # Obtener categoría desde item de Alegra
-            item_category = item.get('itemCategory', {})
-            category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
-
-            prices = item.get('price', [])
-            sale_price = prices[0].get('price', 0) if prices else 0
-
-            valor_inv = quantity * unit_cost
-            valor_venta = quantity * sale_price
-            margen = valor_venta - valor_inv
-
-            # Actualizar departamento
-            dept = departments[gender]
-            dept['total_items'] += 1
-            if quantity > 0:
-                dept['total_unidades'] += quantity
-                dept['valor_inventario'] += valor_inv
-                dept['valor_potencial_venta'] += valor_venta
-                dept['margen'] += margen
-
-                # Por categoría dentro del departamento
-                cat = dept['por_categoria'][category_name]
-                cat['total_items'] += 1
-                cat['total_unidades'] += quantity
-                cat['valor_inventario'] += valor_inv
+        departments = self._compute()['departments']
 
         # Convertir a dict normal y formatear
         result = {}
@@ -227,35 +317,9 @@ class InventoryAnalytics:
                 ...
             ]
         """
-        categories = defaultdict(lambda: {
-            'total_items': 0,
-            'total_unidades': 0,
-            'valor_inventario': 0
-        })
-
-        total_valor = 0
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            item_category = item.get('itemCategory', {})
-            category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
-
-            valor = quantity * unit_cost
-            total_valor += valor
-
-            cat = categories[category_name]
-            cat['total_items'] += 1
-            cat['total_unidades'] += quantity
-            cat['valor_inventario'] += valor
+        agg = self._compute()
+        categories = agg['categories']
+        total_valor = agg['total_valor']
 
         # Convertir a lista y calcular porcentajes
         result = []
@@ -289,33 +353,7 @@ class InventoryAnalytics:
                 ...
             ]
         """
-        sizes = defaultdict(lambda: {
-            'total_unidades': 0,
-            'valor_inventario': 0,
-            'cantidad_items': 0
-        })
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            name = item.get('name', '')
-            parsed = self.sku_parser.extract_size_from_product_name(name)
-            size = parsed.get('size', 'UNKNOWN')
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
-
-            valor = quantity * unit_cost
-
-            sz = sizes[size]
-            sz['total_unidades'] += quantity
-            sz['valor_inventario'] += valor
-            sz['cantidad_items'] += 1
+        sizes = self._compute()['sizes']
 
         # Convertir a lista
         result = []
@@ -348,37 +386,7 @@ class InventoryAnalytics:
                 ...
             ]
         """
-        out_of_stock = []
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-
-            if quantity == 0:
-                name = item.get('name', '')
-                parsed = self.sku_parser.extract_size_from_product_name(name)
-
-                item_category = item.get('itemCategory', {})
-                category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
-
-                prices = item.get('price', [])
-                sale_price = prices[0].get('price', 0) if prices else 0
-
-                out_of_stock.append({
-                    'id': item.get('id', ''),
-                    'nombre': name,
-                    'categoria': category_name,
-                    'departamento': parsed.get('gender', 'UNKNOWN'),
-                    'precio_venta': sale_price
-                })
-
-        return out_of_stock
+        return [dict(product) for product in self._compute()['out_of_stock']]
 
     def get_low_stock(self, threshold: int = 5) -> List[Dict]:
         """
@@ -390,36 +398,18 @@ class InventoryAnalytics:
         Returns:
             Lista de productos con bajo stock
         """
-        low_stock = []
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-
-            if 0 < quantity <= threshold:
-                name = item.get('name', '')
-                parsed = self.sku_parser.extract_size_from_product_name(name)
-
-                item_category = item.get('itemCategory', {})
-                category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
-
-                prices = item.get('price', [])
-                sale_price = prices[0].get('price', 0) if prices else 0
-
-                low_stock.append({
-                    'id': item.get('id', ''),
-                    'nombre': name,
-                    'categoria': category_name,
-                    'departamento': parsed.get('gender', 'UNKNOWN'),
-                    'cantidad_disponible': quantity,
-                    'precio_venta': sale_price
-                })
+        low_stock = [
+            {
+                'id': product['id'],
+                'nombre': product['nombre'],
+                'categoria': product['categoria'],
+                'departamento': product['departamento'],
+                'cantidad_disponible': product['cantidad'],
+                'precio_venta': product['precio_venta']
+            }
+            for product in self._compute()['stocked']
+            if 0 < product['cantidad'] <= threshold
+        ]
 
         # Ordenar por cantidad disponible
         low_stock.sort(key=lambda x: x['cantidad_disponible'])
@@ -435,48 +425,12 @@ class InventoryAnalytics:
         Returns:
             Lista de top productos ordenados por valor
         """
-        products = []
-
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
-
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
-
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
-
-            if quantity == 0:
-                continue
-
-            name = item.get('name', '')
-            parsed = self.sku_parser.extract_size_from_product_name(name)
-
-            item_category = item.get('itemCategory', {})
-            category_name = item_category.get('name', 'SIN CATEGORÍA') if item_category else 'SIN CATEGORÍA'
+        products = self._compute()['stocked']
 
-            prices = item.get('price', [])
-            sale_price = prices[0].get('price', 0) if prices else 0
-
-            valor = quantity * unit_cost
-
-            products.append({
-                'id': item.get('id', ''),
-                'nombre': name,
-                'categoria': category_name,
-                'departamento': parsed.get('gender', 'UNKNOWN'),
-                'cantidad': quantity,
-                'costo_unitario': unit_cost,
-                'precio_venta': sale_price,
-                'valor_inventario': int(valor),
-                'valor_potencial_venta': int(quantity * sale_price)
-            })
-
-        # Ordenar por valor descendente
-        products.sort(key=lambda x: x['valor_inventario'], reverse=True)
-        return products[:limit]
+        # Los `limit` de mayor valor sin ordenar la lista completa (mismo orden
+        # que sorted(..., reverse=True)[:limit], incluso en empates)
+        top = heapq.nlargest(limit, products, key=itemgetter('valor_inventario'))
+        return [dict(product) for product in top]
 
     def get_abc_analysis(self) -> Dict:
         """
@@ -499,58 +453,46 @@ class InventoryAnalytics:
                 'clase_C': {...}
             }
         """
-        # Obtener todos los productos con valor
-        products = []
-        total_valor = 0
+        agg = self._compute()
+        total_valor = agg['abc_total']
 
-        for item in self.items:
-            if item.get('type') != 'variant':
-                continue
+        # Valores de los productos, ordenados descendente
+        valores = sorted(agg['abc_valores'], reverse=True)
 
-            inventory = item.get('inventory', {})
-            if not inventory:
-                continue
+        # Clasificar en A, B, C según el porcentaje acumulado del valor
+        total_items = len(valores)
+        acumulados = list(accumulate(valores))
 
-            quantity = inventory.get('availableQuantity', 0)
-            unit_cost = inventory.get('unitCost', 0)
+        def porcentaje(valor_acumulado):
+            return valor_acumulado / total_valor * 100 if total_valor > 0 else 0
 
-            valor = quantity * unit_cost
-            if valor == 0:
-                continue
+        # Mientras los valores son positivos el acumulado solo crece: los cortes
+        # de las clases A (<= 80%) y B (<= 95%) se ubican con búsqueda binaria
+        positivos = bisect_left(valores, 0, key=neg)
+        fin_a = bisect_right(acumulados, 80, 0, positivos, key=porcentaje)
+        fin_b = bisect_right(acumulados, 95, fin_a, positivos, key=porcentaje)
 
-            total_valor += valor
-            products.append({
-                'id': item.get('id', ''),
-                'nombre': item.get('name', ''),
-                'valor': valor
-            })
+        clase_a_items = fin_a
+        clase_b_items = fin_b - fin_a
+        clase_c_items = positivos - fin_b
+        clase_a_valor = sum(valores[:fin_a])
+        clase_b_valor = sum(valores[fin_a:fin_b])
+        clase_c_valor = sum(valores[fin_b:positivos])
 
-        # Ordenar por valor descendente
-        products.sort(key=lambda x: x['valor'], reverse=True)
-
-        # Clasificar en A, B, C
-        total_items = len(products)
-        valor_acumulado = 0
-        clase_a_items = 0
-        clase_b_items = 0
-        clase_c_items = 0
-        clase_a_valor = 0
-        clase_b_valor = 0
-        clase_c_valor = 0
-
-        for i, prod in enumerate(products):
-            valor_acumulado += prod['valor']
-            porcentaje_valor = valor_acumulado / total_valor * 100 if total_valor > 0 else 0
+        # Valores negativos (cantidades negativas en Alegra): el acumulado
+        # decrece, se clasifican uno a uno
+        for valor, valor_acumulado in zip(valores[positivos:], acumulados[positivos:]):
+            porcentaje_valor = porcentaje(valor_acumulado)
 
             if porcentaje_valor <= 80:
                 clase_a_items += 1
-                clase_a_valor += prod['valor']
+                clase_a_valor += valor
             elif porcentaje_valor <= 95:
                 clase_b_items += 1
-                clase_b_valor += prod['valor']
+                clase_b_valor += valor
             else:
                 clase_c_items += 1
-                clase_c_valor += prod['valor']
+                clase_c_valor += valor
 
         return {
             'clase_A': {
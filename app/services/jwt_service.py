@@ -3,11 +3,19 @@ Servicio para manejo de JWT tokens
 """
 import jwt
 from datetime import datetime, timedelta
+from cachetools import TTLCache
 from flask import current_app
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Cache de payloads ya verificados (por proceso) para no repetir el HMAC
+# en peticiones consecutivas con el mismo token (polling del frontend)
+_verified_tokens = TTLCache(maxsize=4096, ttl=30)
+_verified_tokens_lock = threading.Lock()
+
 
 class JWTService:
     """Servicio para generar y validar tokens JWT"""
@@ -62,12 +70,22 @@ class JWTService:
             jwt.ExpiredSignatureError: Si el token ha expirado
             jwt.InvalidTokenError: Si el token es inválido
         """
-        try:
-            secret_key = current_app.config.get('JWT_SECRET_KEY')
-            algorithm = current_app.config.get('JWT_ALGORITHM', 'HS256')
+        secret_key = current_app.config.get('JWT_SECRET_KEY')
+        algorithm = current_app.config.get('JWT_ALGORITHM', 'HS256')
+        cache_key = (token, secret_key, algorithm)
 
+        with _verified_tokens_lock:
+            payload = _verified_tokens.get(cache_key)
+        if payload is not None and payload.get('exp', 0) > time.time():
+            # Copia: quien llama no debe poder modificar el payload cacheado
+            return dict(payload)
+
+        try:
             payload = jwt.decode(token, secret_key, algorithms=[algorithm])
 
+            with _verified_tokens_lock:
+                _verified_tokens[cache_key] = dict(payload)
+
             return payload
 
         except jwt.ExpiredSignatureError:
@@ -77,6 +95,18 @@ class JWTService:
             logger.warning(f"Token inválido: {str(e)}")
             raise
 
+    @staticmethod
+    def invalidate_token(token: str) -> None:
+        """
+        Elimina un token del cache de verificación (p. ej. al cerrar sesión)
+
+        Args:
+            token: Token JWT
+        """
+        with _verified_tokens_lock:
+            for cache_key in [k for k in _verified_tokens.keys() if k[0] == token]:
+                _verified_tokens.pop(cache_key, None)
+
     @staticmethod
     def decode_token_without_verification(token: str) -> dict:
         """
@@ -2,6 +2,9 @@
 Servicio de resolución de problemas Knapsack
 Algoritmo de programación dinámica para calcular la base exacta de caja
 """
+from array import array
+from functools import reduce
+from math import gcd
 from typing import Dict, Tuple
 import logging
 
@@ -79,11 +82,17 @@ class KnapsackSolver:
             - Maximiza denominaciones pequeñas (menudo) en la base
             - Busca combinación exacta del objetivo
         """
-        MAX = self.objetivo
         NEG = self.NEG
 
-        # Tabla DP: dp[s] = máximo aporte de menudo al llegar a suma s
-        dp = [NEG] * (MAX + 1)
+        # Toda suma alcanzable es múltiplo del MCD de las denominaciones (y del
+        # objetivo): se trabaja en esa unidad (ej. $50), lo que reduce la tabla
+        # de 450.001 a 9.001 posiciones sin cambiar la solución
+        unidad = reduce(gcd, (d for d, c in todas_denoms.items() if c > 0), self.objetivo) or 1
+        MAX = self.objetivo // unidad
+
+        # Tabla DP: dp[s] = máximo aporte de menudo al llegar a suma s * unidad
+        # (arreglo contiguo de enteros de 64 bits)
+        dp = array('q', [NEG]) * (MAX + 1)
         dp[0] = 0
 
         # prev[s] guarda el estado previo para reconstruir la solución
@@ -100,7 +109,7 @@ class KnapsackSolver:
                 valor_total = denom * k
                 # Aporte de menudo: si la denominación es <= umbral, cuenta
                 aporte_menudo = valor_total if denom <= self.umbral_menudo else 0
-                items.append((valor_total, aporte_menudo, denom, k))
+                items.append((valor_total // unidad, aporte_menudo, denom, k))
 
         logger.debug(f"Items preparados: {len(items)} después de descomposición binaria")
 
@@ -116,7 +125,7 @@ class KnapsackSolver:
 
         # Caso 1: Se alcanzó el objetivo exacto
         if dp[MAX] != NEG:
-            logger.info(f"✓ Base exacta alcanzada: ${MAX:,}")
+            logger.info(f"✓ Base exacta alcanzada: ${self.objetivo:,}")
             usado = self._reconstruir_solucion(prev, MAX)
             conteo_base = {d: usado.get(d, 0) for d in todas_denoms}
             conteo_consignar = {d: todas_denoms[d] - conteo_base[d] for d in todas_denoms}
@@ -138,11 +147,11 @@ class KnapsackSolver:
             return conteo_base, conteo_consignar, restante, False
 
         # Reconstruir la mejor solución parcial
-        logger.warning(f"⚠ Base inexacta: ${mejor_s:,} de ${MAX:,} (falta ${MAX - mejor_s:,})")
+        restante = self.objetivo - mejor_s * unidad
+        logger.warning(f"⚠ Base inexacta: ${mejor_s * unidad:,} de ${self.objetivo:,} (falta ${restante:,})")
         usado = self._reconstruir_solucion(prev, mejor_s)
         conteo_base = {d: usado.get(d, 0) for d in todas_denoms}
         conteo_consignar = {d: todas_denoms[d] - conteo_base[d] for d in todas_denoms}
-        restante = self.objetivo - mejor_s
 
         return conteo_base, conteo_consignar, restante, False
 
@@ -152,7 +161,7 @@ class KnapsackSolver:
 
         Args:
             prev: Tabla de backtracking
-            suma_final: Suma final alcanzada
+            suma_final: Suma final alcanzada (en unidades de la tabla DP)
 
         Returns:
             Dict {denominación: cantidad_usada}
@@ -0,0 +1,125 @@
+"""
+Servicio para hashing y verificación de contraseñas
+Argon2id como esquema principal, bcrypt como esquema legado
+"""
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Prefijos de los hashes almacenados, usados para detectar el esquema
+ARGON2_PREFIX = '$argon2'
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+# Pool dedicado al hashing (Argon2 y bcrypt liberan el GIL). Limita los hashes
+# simultáneos a la cantidad de CPUs: cada hash Argon2 reserva ARGON2_MEMORY_COST
+# KiB, así que muchos logins concurrentes no disparan el uso de memoria.
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='password-hash')
+
+
+def _bcrypt_check(password: str, password_hash: str) -> bool:
+    """Verifica una contraseña contra un hash bcrypt legado"""
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+class PasswordService:
+    """Servicio para hashear y verificar contraseñas"""
+
+    _hasher = PasswordHasher()
+    # Hash Argon2 de referencia para verificaciones ficticias (se crea al primer uso)
+    _dummy_hash = None
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Configura el hasher Argon2 con los parámetros de la aplicación
+
+        Args:
+            app: Instancia de Flask
+        """
+        cls._hasher = PasswordHasher(
+            time_cost=app.config.get('ARGON2_TIME_COST', 2),
+            memory_cost=app.config.get('ARGON2_MEMORY_COST', 65536),
+            parallelism=app.config.get('ARGON2_PARALLELISM', 1)
+        )
+        cls._dummy_hash = None
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
+        """
+        Genera el hash Argon2id de una contraseña
+
+        Args:
+            password: Contraseña en texto plano
+
+        Returns:
+            Hash en formato PHC ($argon2id$...)
+        """
+        return _hash_pool.submit(cls._hasher.hash, password).result()
+
+    @classmethod
+    def verify_password(cls, password: str, password_hash: str) -> bool:
+        """
+        Verifica una contraseña contra su hash (Argon2id o bcrypt legado)
+
+        Args:
+            password: Contraseña en texto plano
+            password_hash: Hash almacenado
+
+        Returns:
+            True si la contraseña coincide
+        """
+        if not password_hash:
+            cls._dummy_verify(password)
+            return False
+
+        if password_hash.startswith(ARGON2_PREFIX):
+            try:
+                return _hash_pool.submit(cls._hasher.verify, password_hash, password).result()
+            except (VerificationError, InvalidHashError):
+                return False
+
+        if password_hash.startswith(BCRYPT_PREFIXES):
+            try:
+                return _hash_pool.submit(_bcrypt_check, password, password_hash).result()
+            except ValueError:
+                return False
+
+        logger.warning("Hash de contrasena con esquema desconocido")
+        cls._dummy_verify(password)
+        return False
+
+    @classmethod
+    def _dummy_verify(cls, password: str) -> None:
+        """
+        Ejecuta una verificación Argon2 descartable para que un hash vacío o
+        malformado tarde lo mismo que uno válido (sin canal lateral de tiempo)
+        """
+        if cls._dummy_hash is None:
+            cls._dummy_hash = _hash_pool.submit(cls._hasher.hash, 'dummy-password').result()
+        try:
+            _hash_pool.submit(cls._hasher.verify, cls._dummy_hash, password).result()
+        except VerificationError:
+            pass
+
+    @classmethod
+    def needs_rehash(cls, password_hash: str) -> bool:
+        """
+        Indica si el hash debe regenerarse (bcrypt legado o parámetros Argon2 desactualizados)
+
+        Args:
+            password_hash: Hash almacenado
+
+        Returns:
+            True si se debe volver a hashear la contraseña
+        """
+        if not password_hash.startswith(ARGON2_PREFIX):
+            return True
+        try:
+            return cls._hasher.check_needs_rehash(password_hash)
+        except InvalidHashError:
+            return True
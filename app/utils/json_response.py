@@ -0,0 +1,74 @@
+"""
+Respuestas JSON serializadas con orjson
+"""
+import decimal
+from datetime import date
+
+from flask import current_app
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+import orjson
+
+# Opciones del proveedor JSON de la app. Las fechas se delegan a _default para
+# conservar el formato HTTP que usaba jsonify (DefaultJSONProvider). A diferencia
+# de DefaultJSONProvider, las claves no se ordenan (se respeta el orden del dict)
+# y el texto no ASCII se escribe en UTF-8 en lugar de escaparse como \uXXXX
+_PROVIDER_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(o):
+    """Tipos que orjson no serializa de forma nativa (igual que DefaultJSONProvider)"""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Proveedor JSON de Flask basado en orjson
+
+    Reemplaza al json de la librería estándar en jsonify, request.get_json
+    y demás usos internos de Flask.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=_PROVIDER_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Escribe los bytes de orjson directo en la respuesta (sin decode/encode)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_PROVIDER_OPTIONS),
+            mimetype='application/json'
+        )
+
+
+def ojsonify(obj, status=200):
+    """
+    Equivalente a jsonify usando orjson (serializa directo a bytes UTF-8)
+
+    Usa las mismas opciones que OrjsonProvider (el proveedor de la app), así que
+    serializa igual que jsonify en esta app: Decimal como string, fechas en
+    formato HTTP y claves no string convertidas a string. Frente al jsonify de
+    Flask por defecto, las claves conservan el orden del dict (sin sort_keys) y
+    el texto no ASCII sale en UTF-8 sin escapar.
+
+    Args:
+        obj: Objeto serializable (dict, list, Decimal, etc.)
+        status: Código HTTP de la respuesta
+
+    Returns:
+        Response de Flask con mimetype application/json
+    """
+    return current_app.response_class(
+        orjson.dumps(obj, default=_default, option=_PROVIDER_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
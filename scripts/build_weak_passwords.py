@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Script para generar app/data/weak_passwords.txt (lista de contraseñas comunes)
+Ejecutar: python scripts/build_weak_passwords.py
+
+El archivo guarda solo el SHA-256 (hex) de cada contraseña en minúsculas.
+Para agregar o quitar entradas, editar las listas de este script y volver a
+ejecutarlo; no editar el archivo generado a mano.
+"""
+import hashlib
+import os
+
+OUTPUT_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'app', 'data', 'weak_passwords.txt'
+)
+
+# Palabras comunes y términos locales que se combinan con los sufijos
+BASES = [
+    'password', 'passw0rd', 'p@ssw0rd', 'p@ssword', 'welcome', 'qwerty', 'qwertyuiop', 'admin', 'administrador',
+    'abc', 'abcd', 'abcdef', 'letmein', 'iloveyou', 'teamo', 'monkey', 'dragon', 'sunshine', 'princess', 'princesa',
+    'football', 'futbol', 'baseball', 'master', 'shadow', 'superman', 'batman', 'michael', 'jennifer', 'colombia',
+    'bogota', 'medellin', 'koaj', 'ventas', 'contrasena', 'contraseña', 'usuario', 'cambiar', 'changeme', 'asdfgh',
+    'zxcvbn', 'summer', 'winter', 'hello', 'hola', 'secret', 'secreto', 'login', 'puerto', 'carreno',
+    'puertocarreno', 'ventascarreno', 'tienda', 'caja', 'cierre', 'cierrecaja', 'empresa', 'america', 'familia',
+    'amor', 'dios', 'jesus', 'maria', 'daniela', 'valentina', 'santiago', 'sebastian', 'alejandro', 'andrea',
+    'test', 'prueba', 'demo', 'user', 'guest', 'root', 'access', 'trustno1', 'starwars', 'pokemon', 'naruto',
+    'samsung', 'iphone', 'google', 'facebook', 'whatsapp',
+]
+
+# Sufijos numéricos y de año habituales
+SUFFIXES = [
+    '1', '12', '123', '1234', '12345', '123456', '01',
+    '2020', '2021', '2022', '2023', '2024', '2025', '2026', '2027',
+]
+
+# Contraseñas sueltas (patrones de teclado y la contraseña por defecto del admin)
+EXTRA = [
+    'aa123456', 'abc12345', 'abcd1234', 'qwe12345', 'qwer1234', 'asdf1234', 'zxcv1234', '1q2w3e4r', '1qaz2wsx',
+    'q1w2e3r4', 'a1b2c3d4', 'aa112233', 'abc123456', 'pass1234', 'test1234', 'admin1234', 'user1234', '1234qwer',
+    '123qweasd', 'qazwsx123', '12345qwert', 'password!1', 'ventascarreno2025.*', 'qwerty12345', 'a123456789',
+]
+
+HEADER = (
+    "# SHA-256 (hex) de contraseñas comunes en minúsculas, una por línea.\n"
+    "# Se rechazan sin importar mayúsculas/minúsculas (ver validate_password en app/routes/users.py).\n"
+    "# Archivo generado por scripts/build_weak_passwords.py; editar las listas de ese script y regenerar.\n"
+)
+
+
+def build_words():
+    """
+    Construye el conjunto de contraseñas comunes
+
+    Solo se incluyen las que pasarían las reglas estructurales de
+    validate_password (8-128 caracteres, al menos una letra y un dígito);
+    las demás ya se rechazan antes de consultar la lista.
+
+    Returns:
+        Set con las contraseñas en minúsculas
+    """
+    words = {base + suffix for base in BASES for suffix in SUFFIXES}
+    words.update(EXTRA)
+    return {
+        w.lower() for w in words
+        if 8 <= len(w) <= 128
+        and any(c.isdigit() for c in w)
+        and any(c.isalpha() for c in w)
+    }
+
+
+def main():
+    hashes = sorted(hashlib.sha256(w.encode('utf-8')).hexdigest() for w in build_words())
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        f.write('\n'.join(hashes) + '\n')
+
+    print(f"{len(hashes)} hashes escritos en {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 
 @pytest.fixture
-def app():
-    """Fixture para la aplicación Flask"""
+def app(tmp_path):
+    """Fixture para la aplicación Flask (con una base SQLite temporal)"""
     from app import create_app
     from app.config import TestingConfig
 
-    app = create_app(TestingConfig)
+    class _TestConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    app = create_app(_TestConfig)
     return app
 
 
@@ -29,3 +33,13 @@ def client(app):
 def runner(app):
     """Fixture para el runner CLI"""
     return app.test_cli_runner()
+
+
+@pytest.fixture
+def admin_headers(app):
+    """Fixture con el header Authorization de un usuario admin"""
+    from app.services.jwt_service import JWTService
+
+    with app.app_context():
+        token = JWTService.generate_token(user_id=1, email='admin@test.co', role='admin')
+    return {'Authorization': f'Bearer {token}'}
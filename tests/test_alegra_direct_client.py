@@ -0,0 +1,187 @@
+"""
+Tests para el circuit breaker y los reintentos de AlegraDirectClient
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+import urllib3.util.retry as urllib3_retry
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, ReadTimeoutError
+from urllib3.response import HTTPResponse
+
+from app.exceptions import AlegraCircuitOpenError
+from app.services import alegra_direct_client
+from app.services.alegra_direct_client import (
+    ALEGRA_RETRY,
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    RETRY_AFTER_MAX,
+    AlegraDirectClient,
+)
+
+
+def _response(status=200, body=b'{"ok": 1}'):
+    """Response de requests armada a mano"""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = 'https://alegra.test/x'
+    return response
+
+
+class FakeSession:
+    """Reemplazo de Session.get: devuelve (o lanza) los resultados programados"""
+
+    def __init__(self):
+        self.calls = 0
+        self.outcome = _response()
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj manual para time.monotonic del cliente"""
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(alegra_direct_client, 'time', SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+@pytest.fixture
+def direct_client(monkeypatch, clock):
+    """Cliente sin cache con Session.get falso"""
+    alegra = AlegraDirectClient('u', 't', 'https://alegra.test', timeout=1, cache_ttl=0)
+    session = FakeSession()
+    monkeypatch.setattr(alegra.session, 'get', session.get)
+    alegra.fake_session = session
+    return alegra
+
+
+def _fail(client, times):
+    """Hace `times` peticiones que fallan por conexión"""
+    client.fake_session.outcome = requests.exceptions.ConnectionError('caído')
+    for _ in range(times):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._make_request('/x')
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, direct_client):
+        """Test que tras el umbral de fallos las peticiones fallan sin llamar a Alegra"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD)
+
+        with pytest.raises(AlegraCircuitOpenError) as excinfo:
+            direct_client._make_request('/x')
+
+        assert direct_client.fake_session.calls == CIRCUIT_FAILURE_THRESHOLD
+        assert excinfo.value.status_code == 503
+        assert excinfo.value.to_dict()['type'] == 'circuit_open'
+
+    def test_success_resets_failure_count(self, direct_client):
+        """Test que una respuesta correcta reinicia la cuenta de fallos"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD - 1)
+        direct_client.fake_session.outcome = _response()
+        assert direct_client._make_request('/x') == {'ok': 1}
+
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD - 1)
+        direct_client.fake_session.outcome = _response()
+        assert direct_client._make_request('/x') == {'ok': 1}
+
+    def test_server_errors_count_client_errors_do_not(self, direct_client):
+        """Test que los 5xx abren el circuito y los 4xx no"""
+        direct_client.fake_session.outcome = _response(404, b'{}')
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            with pytest.raises(requests.exceptions.HTTPError):
+                direct_client._make_request('/x')
+
+        direct_client.fake_session.outcome = _response(503, b'{}')
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            with pytest.raises(requests.exceptions.HTTPError):
+                direct_client._make_request('/x')
+
+        with pytest.raises(AlegraCircuitOpenError):
+            direct_client._make_request('/x')
+
+    def test_stays_open_during_cooldown(self, direct_client, clock):
+        """Test que el circuito sigue abierto hasta que pasa el cooldown"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD)
+
+        clock.now += CIRCUIT_COOLDOWN - 0.1
+        with pytest.raises(AlegraCircuitOpenError):
+            direct_client._make_request('/x')
+        assert direct_client.fake_session.calls == CIRCUIT_FAILURE_THRESHOLD
+
+    def test_half_open_probe_success_closes(self, direct_client, clock):
+        """Test que pasado el cooldown una petición de prueba exitosa cierra el circuito"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD)
+
+        clock.now += CIRCUIT_COOLDOWN
+        direct_client.fake_session.outcome = _response()
+        assert direct_client._make_request('/x') == {'ok': 1}
+
+        # Cerrado: un fallo aislado ya no lo abre
+        _fail(direct_client, 1)
+        direct_client.fake_session.outcome = _response()
+        assert direct_client._make_request('/x') == {'ok': 1}
+
+    def test_half_open_probe_failure_reopens(self, direct_client, clock):
+        """Test que si la petición de prueba falla el circuito se abre de nuevo"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD)
+
+        clock.now += CIRCUIT_COOLDOWN
+        _fail(direct_client, 1)
+        assert direct_client.fake_session.calls == CIRCUIT_FAILURE_THRESHOLD + 1
+
+        clock.now += 0.1
+        with pytest.raises(AlegraCircuitOpenError):
+            direct_client._make_request('/x')
+        assert direct_client.fake_session.calls == CIRCUIT_FAILURE_THRESHOLD + 1
+
+    def test_sales_totals_reports_open_circuit(self, direct_client):
+        """Test que los métodos públicos devuelven el error del circuito abierto"""
+        _fail(direct_client, CIRCUIT_FAILURE_THRESHOLD)
+
+        result = direct_client.get_sales_totals('2025-12-01', '2025-12-01', use_cache=False)
+
+        assert result['success'] is False
+        assert direct_client.fake_session.calls == CIRCUIT_FAILURE_THRESHOLD
+
+
+class TestCappedRetry:
+    def _http_response(self, retry_after):
+        headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        return HTTPResponse(status=503, headers=headers, preload_content=False)
+
+    def test_retry_after_is_capped(self):
+        """Test que un Retry-After mayor al tope se limita a RETRY_AFTER_MAX"""
+        assert ALEGRA_RETRY.get_retry_after(self._http_response('100')) == RETRY_AFTER_MAX
+        assert ALEGRA_RETRY.get_retry_after(self._http_response('3')) == 3
+        assert ALEGRA_RETRY.get_retry_after(self._http_response(None)) is None
+
+    def test_sleep_uses_capped_value(self, monkeypatch):
+        """Test que la espera real ante Retry-After no supera el tope"""
+        slept = []
+        monkeypatch.setattr(urllib3_retry, 'time', SimpleNamespace(sleep=slept.append, time=time.time))
+
+        assert ALEGRA_RETRY.sleep_for_retry(self._http_response('100')) is True
+        assert slept == [RETRY_AFTER_MAX]
+
+    def test_read_timeout_not_retried(self):
+        """Test que un timeout de lectura agota los reintentos de inmediato"""
+        error = ReadTimeoutError(None, '/x', 'Read timed out')
+
+        with pytest.raises(MaxRetryError):
+            ALEGRA_RETRY.increment(method='GET', url='/x', error=error)
+
+    def test_connect_error_is_retried(self):
+        """Test que un error de conexión sí se reintenta"""
+        error = ConnectTimeoutError(None, '/x', 'Connect timed out')
+
+        retry = ALEGRA_RETRY.increment(method='GET', url='/x', error=error)
+
+        assert retry.total == ALEGRA_RETRY.total - 1
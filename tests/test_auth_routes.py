@@ -0,0 +1,37 @@
+"""
+Tests para las rutas de autenticación
+"""
+import pytest
+
+from app.services.jwt_service import JWTService, _verified_tokens
+
+
+@pytest.fixture
+def sales_token(app):
+    """Token JWT de un usuario sales"""
+    with app.app_context():
+        return JWTService.generate_token(user_id=7, email='ventas@test.co', role='sales')
+
+
+def _is_cached(token):
+    return any(cache_key[0] == token for cache_key in _verified_tokens.keys())
+
+
+class TestLogout:
+    def test_logout_invalidates_bearer_token(self, client, sales_token):
+        """Test que el logout descarta el payload cacheado de un token enviado por header"""
+        headers = {'Authorization': f'Bearer {sales_token}'}
+        assert client.get('/auth/verify', headers=headers).status_code == 200
+        assert _is_cached(sales_token)
+
+        assert client.post('/auth/logout', headers=headers).status_code == 200
+        assert not _is_cached(sales_token)
+
+    def test_logout_invalidates_cookie_token(self, client, sales_token):
+        """Test que el logout descarta el payload cacheado del token de la cookie"""
+        client.set_cookie('access_token', sales_token)
+        assert client.get('/auth/verify').status_code == 200
+        assert _is_cached(sales_token)
+
+        assert client.post('/auth/logout').status_code == 200
+        assert not _is_cached(sales_token)
@@ -0,0 +1,155 @@
+"""
+Tests para los jobs en segundo plano del reporte de valor de inventario
+"""
+import threading
+
+import pytest
+from cachetools import TTLCache
+
+from app.routes import direct_api
+
+JOBS_URL = '/api/direct/inventory/value-report/jobs'
+
+
+class StubDirectClient:
+    """Cliente de Alegra falso: cuenta las llamadas y puede bloquearse hasta release()"""
+
+    def __init__(self, result=None, block=False):
+        self.calls = []
+        self.result = result or {'success': True, 'data': [{'id': 1}], 'metadata': {'total_returned': 1}}
+        self._gate = threading.Event()
+        if not block:
+            self._gate.set()
+
+    def release(self):
+        self._gate.set()
+
+    def get_inventory_value_report_paginated(self, **params):
+        self.calls.append(params)
+        self._gate.wait(timeout=5)
+        return self.result
+
+
+class FakeClock:
+    """Reloj manual para el TTL de _report_jobs"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza el cache de jobs por uno vacío con reloj manual"""
+    fake = FakeClock()
+    monkeypatch.setattr(direct_api, '_report_jobs', TTLCache(maxsize=64, ttl=5 * 60, timer=fake))
+    return fake
+
+
+def _stub_client(app, monkeypatch, **kwargs):
+    stub = StubDirectClient(**kwargs)
+    monkeypatch.setitem(app.extensions, 'alegra_direct', stub)
+    return stub
+
+
+def _job_id(status_url):
+    return status_url.rsplit('/', 1)[1]
+
+
+def _wait_done(client, status_url, headers):
+    """Espera a que el job termine (relanzándolo con un polling si no existe) y retorna el estado final"""
+    if direct_api._report_jobs.get(_job_id(status_url)) is None:
+        client.get(status_url, headers=headers)
+    future = direct_api._report_jobs.get(_job_id(status_url))
+    if future is not None:
+        future.result(timeout=5)
+    return client.get(status_url, headers=headers)
+
+
+class TestInventoryReportJobs:
+    def test_submit_returns_202(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que el POST responde 202 con el id y la URL de estado"""
+        _stub_client(app, monkeypatch)
+
+        response = client.post(f'{JOBS_URL}?toDate=2025-12-10&limit=100', headers=admin_headers)
+
+        assert response.status_code == 202
+        body = response.get_json()
+        assert body['success'] is True
+        assert body['status_url'] == f"{JOBS_URL}/{body['job_id']}"
+
+    def test_submit_invalid_params(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que parámetros inválidos se rechazan sin lanzar el job"""
+        stub = _stub_client(app, monkeypatch)
+
+        assert client.post(f'{JOBS_URL}?limit=abc', headers=admin_headers).status_code == 400
+        assert client.post(f'{JOBS_URL}?limit=5000', headers=admin_headers).status_code == 400
+        assert client.post(f'{JOBS_URL}?toDate=2025-13-40', headers=admin_headers).status_code == 400
+        assert stub.calls == []
+
+    def test_poll_pending_then_done(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que el polling reporta el job pendiente y luego el resultado"""
+        stub = _stub_client(app, monkeypatch, block=True)
+        status_url = client.post(f'{JOBS_URL}?toDate=2025-12-10', headers=admin_headers).get_json()['status_url']
+
+        pending = client.get(status_url, headers=admin_headers)
+        assert pending.status_code == 200
+        assert pending.get_json()['status'] in ('queued', 'running')
+
+        stub.release()
+        done = _wait_done(client, status_url, admin_headers)
+        body = done.get_json()
+        assert body['status'] == 'done'
+        assert body['result']['data'] == [{'id': 1}]
+        assert len(stub.calls) == 1
+        # El job es el cache del reporte: no se apila sobre el cache del cliente
+        assert stub.calls[0]['use_cache'] is False
+
+    def test_same_params_share_job(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que peticiones idénticas dentro del TTL reutilizan el job"""
+        stub = _stub_client(app, monkeypatch)
+        first = client.post(f'{JOBS_URL}?toDate=2025-12-10', headers=admin_headers).get_json()
+        second = client.post(f'{JOBS_URL}?toDate=2025-12-10', headers=admin_headers).get_json()
+
+        assert first['job_id'] == second['job_id']
+        _wait_done(client, first['status_url'], admin_headers)
+        assert len(stub.calls) == 1
+
+    def test_bad_job_id(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que un job_id que no decodifica a parámetros válidos responde 400"""
+        stub = _stub_client(app, monkeypatch)
+
+        assert client.get(f'{JOBS_URL}/no-es-un-job', headers=admin_headers).status_code == 400
+        # JSON válido pero con un límite fuera de rango: ["2025-12-10", 9999, 200, ""]
+        out_of_range = 'WyIyMDI1LTEyLTEwIiw5OTk5LDIwMCwiIl0'
+        assert client.get(f'{JOBS_URL}/{out_of_range}', headers=admin_headers).status_code == 400
+        assert stub.calls == []
+
+    def test_relaunch_after_ttl(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que al vencer el TTL de 5 minutos el polling relanza el job"""
+        stub = _stub_client(app, monkeypatch)
+        status_url = client.post(f'{JOBS_URL}?toDate=2025-12-10', headers=admin_headers).get_json()['status_url']
+        _wait_done(client, status_url, admin_headers)
+
+        clock.now += 5 * 60 + 1
+        assert direct_api._report_jobs.get(_job_id(status_url)) is None
+
+        assert _wait_done(client, status_url, admin_headers).get_json()['status'] == 'done'
+        assert len(stub.calls) == 2
+
+    def test_alegra_error_is_not_kept(self, app, client, admin_headers, clock, monkeypatch):
+        """Test que un error de Alegra no queda cacheado: el siguiente polling relanza"""
+        stub = _stub_client(app, monkeypatch, result={'success': False, 'error': 'timeout'})
+        status_url = client.post(f'{JOBS_URL}?toDate=2025-12-10', headers=admin_headers).get_json()['status_url']
+
+        failed = _wait_done(client, status_url, admin_headers).get_json()
+        assert failed['result']['success'] is False
+        assert direct_api._report_jobs.get(_job_id(status_url)) is None
+
+        client.get(status_url, headers=admin_headers)
+        relaunched = direct_api._report_jobs.get(_job_id(status_url))
+        if relaunched is not None:
+            relaunched.result(timeout=5)
+        assert len(stub.calls) == 2
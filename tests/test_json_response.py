@@ -0,0 +1,48 @@
+"""
+Tests para las respuestas JSON con orjson
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from app.utils.json_response import OrjsonProvider, ojsonify
+
+
+def _app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+class TestOjsonify:
+    def test_serialization_format(self):
+        """Test del formato: fechas HTTP, Decimal como string y claves no string"""
+        with _app().app_context():
+            response = ojsonify({
+                'fecha': date(2025, 12, 10),
+                'hora': datetime(2025, 12, 10, 8, 30),
+                'total': Decimal('1500.50'),
+                50: 3
+            }, 201)
+
+        assert response.status_code == 201
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == (
+            b'{"fecha":"Wed, 10 Dec 2025 00:00:00 GMT",'
+            b'"hora":"Wed, 10 Dec 2025 08:30:00 GMT",'
+            b'"total":"1500.50","50":3}'
+        )
+
+    def test_key_order_and_utf8(self):
+        """Test que las claves conservan su orden y el texto no ASCII sale en UTF-8"""
+        with _app().app_context():
+            response = ojsonify({'zona': 'Puerto Carreño', 'año': 2025})
+
+        assert response.get_data() == '{"zona":"Puerto Carreño","año":2025}'.encode('utf-8')
+
+    def test_same_output_as_app_jsonify(self):
+        """Test que ojsonify serializa igual que jsonify con el proveedor de la app"""
+        payload = {'b': Decimal('1.10'), 'a': date(2025, 1, 1), 1: 'ñ'}
+        with _app().app_context():
+            assert ojsonify(payload).get_data() == jsonify(payload).get_data()
@@ -0,0 +1,58 @@
+"""
+Tests para el servicio de JWT
+"""
+import jwt
+import pytest
+from datetime import datetime, timedelta
+from flask import Flask
+
+from app.services.jwt_service import JWTService, _verified_tokens
+
+
+@pytest.fixture
+def jwt_app():
+    """Aplicación mínima con la configuración de JWT"""
+    app = Flask(__name__)
+    app.config.update(JWT_SECRET_KEY='test-secret-key-with-at-least-32-chars', JWT_ALGORITHM='HS256')
+    with app.app_context():
+        yield app
+
+
+class TestJWTService:
+    def test_generate_and_verify(self, jwt_app):
+        """Test que un token generado se verifica (también desde cache)"""
+        token = JWTService.generate_token(user_id=1, email='a@b.co', role='admin')
+        assert JWTService.verify_token(token)['email'] == 'a@b.co'
+        assert JWTService.verify_token(token)['userId'] == 1
+
+    def test_invalid_token(self, jwt_app):
+        """Test que un token con firma inválida se rechaza"""
+        token = jwt.encode({'userId': 1, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                           'otra-clave-distinta-de-al-menos-32-chars', algorithm='HS256')
+        with pytest.raises(jwt.InvalidTokenError):
+            JWTService.verify_token(token)
+
+    def test_cached_payload_respects_exp(self, jwt_app):
+        """Test que un payload cacheado ya expirado no se reutiliza"""
+        token = JWTService.generate_token(user_id=2, email='c@d.co', role='sales')
+        JWTService.verify_token(token)
+        for cache_key, cached in _verified_tokens.items():
+            if cache_key[0] == token:
+                cached['exp'] = 0  # Simula que el token expiró estando en cache
+        assert JWTService.verify_token(token)['exp'] > 0
+
+    def test_cached_payload_is_not_shared(self, jwt_app):
+        """Test que modificar el payload retornado no altera el cache"""
+        token = JWTService.generate_token(user_id=4, email='g@h.co', role='sales')
+        first = JWTService.verify_token(token)
+        first['role'] = 'admin'
+        assert JWTService.verify_token(token)['role'] == 'sales'
+
+    def test_invalidate_token(self, jwt_app):
+        """Test que invalidate_token descarta el payload cacheado"""
+        token = JWTService.generate_token(user_id=3, email='e@f.co', role='sales')
+        first = JWTService.verify_token(token)
+        assert JWTService.verify_token(token) == first
+        JWTService.invalidate_token(token)
+        assert not any(cache_key[0] == token for cache_key in _verified_tokens.keys())
+        assert JWTService.verify_token(token) == first
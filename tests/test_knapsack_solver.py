@@ -61,6 +61,25 @@ class TestKnapsackSolver:
         assert exacto is False
         assert restante > 0
 
+    def test_resolver_objetivo_no_multiplo_de_denominaciones(self):
+        """Test con objetivo que no es múltiplo del MCD de las denominaciones"""
+        solver = KnapsackSolver(objetivo=12345, umbral_menudo=10000)
+
+        todas_denoms = {
+            1000: 5,
+            2000: 5,
+            5000: 1
+        }
+
+        conteo_base, conteo_consignar, restante, exacto = solver.resolver(todas_denoms)
+
+        total_base = sum(d * c for d, c in conteo_base.items())
+        assert exacto is False
+        assert total_base == 12000
+        assert restante == 345
+        for denom in todas_denoms:
+            assert conteo_base[denom] + conteo_consignar[denom] == todas_denoms[denom]
+
 
 class TestConstruirBaseExacta:
     """Tests de la función helper"""
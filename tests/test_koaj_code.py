@@ -0,0 +1,80 @@
+"""
+Tests para el cache del catálogo de códigos KOAJ
+"""
+import pytest
+
+from app.models.koaj_code import KoajCode
+from app.models.user import db
+
+
+@pytest.fixture
+def koaj_ctx(app):
+    """Contexto de la app con el catálogo vacío y el cache descartado"""
+    with app.app_context():
+        KoajCode.invalidate_cache()
+        yield
+        db.session.rollback()
+        KoajCode.invalidate_cache()
+
+
+def _active_codes():
+    return {c['code']: c['category'] for c in KoajCode.get_active_codes()}
+
+
+class TestKoajCodeCache:
+    def test_cache_refreshed_after_insert(self, koaj_ctx):
+        """Test que un código insertado aparece tras el commit"""
+        assert _active_codes() == {}
+
+        db.session.add(KoajCode(code='55', category='Maletas'))
+        db.session.commit()
+
+        assert _active_codes() == {'55': 'Maletas'}
+
+    def test_cache_refreshed_after_update(self, koaj_ctx):
+        """Test que un cambio de categoría se refleja tras el commit"""
+        koaj_code = KoajCode(code='50', category='Gorras')
+        db.session.add(koaj_code)
+        db.session.commit()
+        assert _active_codes() == {'50': 'Gorras'}
+
+        koaj_code.category = 'Gorras y viseras'
+        db.session.commit()
+
+        assert _active_codes() == {'50': 'Gorras y viseras'}
+
+    def test_cache_refreshed_after_delete(self, koaj_ctx):
+        """Test que un código eliminado desaparece tras el commit"""
+        koaj_code = KoajCode(code='49', category='Cinturones')
+        db.session.add(koaj_code)
+        db.session.commit()
+        assert _active_codes() == {'49': 'Cinturones'}
+
+        db.session.delete(koaj_code)
+        db.session.commit()
+
+        assert _active_codes() == {}
+
+    def test_flush_does_not_invalidate(self, koaj_ctx):
+        """Test que el flush (antes del commit) no descarta el cache"""
+        assert _active_codes() == {}
+        cache = KoajCode._cache
+
+        db.session.add(KoajCode(code='48', category='Medias'))
+        db.session.flush()
+        assert KoajCode._cache is cache
+
+        db.session.commit()
+        assert KoajCode._cache is None
+
+    def test_rollback_keeps_cache(self, koaj_ctx):
+        """Test que una escritura revertida no invalida el cache en el siguiente commit"""
+        assert _active_codes() == {}
+        cache = KoajCode._cache
+
+        db.session.add(KoajCode(code='39', category='Gafas'))
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+
+        assert KoajCode._cache is cache
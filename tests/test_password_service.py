@@ -0,0 +1,31 @@
+"""
+Tests para el servicio de contraseñas
+"""
+import bcrypt
+from app.services.password_service import PasswordService
+
+
+class TestPasswordService:
+    def test_hash_password_argon2id(self):
+        """Test que los hashes nuevos usan Argon2id"""
+        password_hash = PasswordService.hash_password("Secreta123")
+        assert password_hash.startswith("$argon2id$")
+        assert PasswordService.verify_password("Secreta123", password_hash)
+        assert not PasswordService.verify_password("Otra1234", password_hash)
+
+    def test_verify_legacy_bcrypt(self):
+        """Test que los hashes bcrypt existentes siguen verificando"""
+        legacy = bcrypt.hashpw(b"Secreta123", bcrypt.gensalt(rounds=4)).decode('utf-8')
+        assert PasswordService.verify_password("Secreta123", legacy)
+        assert not PasswordService.verify_password("Otra1234", legacy)
+
+    def test_needs_rehash(self):
+        """Test detección de hashes que deben migrarse"""
+        legacy = bcrypt.hashpw(b"Secreta123", bcrypt.gensalt(rounds=4)).decode('utf-8')
+        assert PasswordService.needs_rehash(legacy)
+        assert not PasswordService.needs_rehash(PasswordService.hash_password("Secreta123"))
+
+    def test_verify_unknown_scheme(self):
+        """Test que un hash desconocido o vacío no verifica"""
+        assert not PasswordService.verify_password("Secreta123", "texto-plano")
+        assert not PasswordService.verify_password("Secreta123", "")
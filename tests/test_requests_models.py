@@ -0,0 +1,55 @@
+"""
+Tests para los modelos Pydantic de requests
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.models.requests import BILL_ORDER, COIN_ORDER, CashClosingRequest
+
+
+def _request(**fields):
+    return CashClosingRequest(date='2025-01-15', **fields)
+
+
+class TestCashClosingRequestVectors:
+    def test_coins_vec_and_bills_vec(self):
+        """Test que los vectores se mapean en el orden de las denominaciones"""
+        cash_request = _request(coins_vec=[0, 6, 40, 1, 0], bills_vec=[16, 7, 7, 12, 12, 9])
+
+        assert cash_request.get_normalized_coins(COIN_ORDER) == {50: 0, 100: 6, 200: 40, 500: 1, 1000: 0}
+        assert cash_request.get_normalized_bills(BILL_ORDER) == {
+            2000: 16, 5000: 7, 10000: 7, 20000: 12, 50000: 12, 100000: 9
+        }
+
+    def test_vec_wrong_length(self):
+        """Test que un vector con longitud distinta a las denominaciones se rechaza"""
+        with pytest.raises(ValidationError):
+            _request(coins_vec=[1, 2, 3])
+        with pytest.raises(ValidationError):
+            _request(bills_vec=[1] * (len(BILL_ORDER) + 1))
+
+    def test_vec_negative_quantity(self):
+        """Test que un vector con cantidades negativas se rechaza"""
+        with pytest.raises(ValidationError):
+            _request(coins_vec=[0, -1, 0, 0, 0])
+
+    def test_dict_and_vec_rejected(self):
+        """Test que enviar el dict y el vector del mismo conteo se rechaza"""
+        with pytest.raises(ValidationError, match='coins_vec'):
+            _request(coins={'100': 6}, coins_vec=[0, 6, 40, 1, 0])
+        with pytest.raises(ValidationError, match='bills_vec'):
+            _request(bills={'2000': 16}, bills_vec=[16, 7, 7, 12, 12, 9])
+
+    def test_dict_and_vec_of_different_fields(self):
+        """Test que se puede combinar el dict de monedas con el vector de billetes"""
+        cash_request = _request(coins={'100': 6}, bills_vec=[16, 7, 7, 12, 12, 9])
+
+        assert cash_request.get_normalized_coins(COIN_ORDER)[100] == 6
+        assert cash_request.get_normalized_bills(BILL_ORDER)[2000] == 16
+
+    def test_vec_with_other_denominations(self):
+        """Test que el vector no se mapea sobre denominaciones distintas a su orden"""
+        cash_request = _request(coins_vec=[0, 6, 40, 1, 0])
+
+        with pytest.raises(ValueError):
+            cash_request.get_normalized_coins([100, 200, 500, 1000])
@@ -0,0 +1,106 @@
+"""
+Tests para las rutas de gestión de usuarios
+"""
+import pytest
+
+from app.models.user import db, User
+from app.routes.users import DEFAULT_USERS_PER_PAGE, MAX_USERS_PER_PAGE
+
+USERS_URL = '/api/users'
+
+
+@pytest.fixture
+def seed_users(app):
+    """Crea usuarios de prueba directamente en la base de datos"""
+    def seed(count):
+        with app.app_context():
+            db.session.add_all(
+                User(email=f'user{i}@test.co', password_hash='x', name=f'User {i}', role='sales')
+                for i in range(1, count + 1)
+            )
+            db.session.commit()
+    return seed
+
+
+class TestListUsers:
+    def test_default_pagination(self, client, admin_headers, seed_users):
+        """Test de la primera página por defecto y los headers de paginación"""
+        seed_users(3)
+
+        response = client.get(USERS_URL, headers=admin_headers)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert [u['email'] for u in body['users']] == ['user1@test.co', 'user2@test.co', 'user3@test.co']
+        assert (body['total'], body['page'], body['per_page'], body['pages']) == (3, 1, DEFAULT_USERS_PER_PAGE, 1)
+        assert response.headers['X-Total-Count'] == '3'
+        assert response.headers['X-Page'] == '1'
+        assert response.headers['X-Per-Page'] == str(DEFAULT_USERS_PER_PAGE)
+
+    def test_second_page(self, client, admin_headers, seed_users):
+        """Test que page y per_page seleccionan la porción correcta"""
+        seed_users(5)
+
+        body = client.get(f'{USERS_URL}?page=2&per_page=2', headers=admin_headers).get_json()
+
+        assert [u['email'] for u in body['users']] == ['user3@test.co', 'user4@test.co']
+        assert body['pages'] == 3
+
+    def test_per_page_clamped_to_max(self, client, admin_headers, seed_users):
+        """Test que per_page por encima del máximo se limita a MAX_USERS_PER_PAGE"""
+        seed_users(1)
+
+        response = client.get(f'{USERS_URL}?per_page=1000', headers=admin_headers)
+
+        assert response.get_json()['per_page'] == MAX_USERS_PER_PAGE
+        assert response.headers['X-Per-Page'] == str(MAX_USERS_PER_PAGE)
+
+    def test_out_of_range_values(self, client, admin_headers, seed_users):
+        """Test que page y per_page menores a 1 se ajustan a 1"""
+        seed_users(2)
+
+        body = client.get(f'{USERS_URL}?page=0&per_page=-5', headers=admin_headers).get_json()
+
+        assert (body['page'], body['per_page']) == (1, 1)
+        assert [u['email'] for u in body['users']] == ['user1@test.co']
+
+    def test_page_past_the_end(self, client, admin_headers, seed_users):
+        """Test que una página posterior a la última retorna la lista vacía con el total"""
+        seed_users(2)
+
+        response = client.get(f'{USERS_URL}?page=99', headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['users'] == []
+        assert response.headers['X-Total-Count'] == '2'
+
+    @pytest.mark.parametrize('query', ['page=abc', 'per_page=10.5', 'page=', 'per_page=uno'])
+    def test_non_integer_values(self, client, admin_headers, query):
+        """Test que valores no enteros responden 400"""
+        response = client.get(f'{USERS_URL}?{query}', headers=admin_headers)
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+class TestCreateUser:
+    def test_duplicate_email(self, app, client, admin_headers, seed_users):
+        """Test que un email ya registrado (sin importar mayúsculas) responde 409"""
+        seed_users(1)
+
+        response = client.post(USERS_URL, headers=admin_headers, json={
+            'email': 'USER1@test.co', 'password': 'Zx9kLmQ2pW', 'name': 'Otro', 'role': 'sales'
+        })
+
+        assert response.status_code == 409
+        assert response.get_json()['success'] is False
+        with app.app_context():
+            assert User.query.count() == 1
+
+    def test_create_after_duplicate(self, client, admin_headers, seed_users):
+        """Test que tras un 409 (rollback) la sesión sigue usable para crear otro usuario"""
+        seed_users(1)
+        user = {'password': 'Zx9kLmQ2pW', 'name': 'Nuevo', 'role': 'sales'}
+
+        assert client.post(USERS_URL, headers=admin_headers, json={**user, 'email': 'user1@test.co'}).status_code == 409
+        assert client.post(USERS_URL, headers=admin_headers, json={**user, 'email': 'nuevo@test.co'}).status_code == 201